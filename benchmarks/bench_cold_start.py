@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for the pattern registry.
+
+Measures, in a fresh interpreter per run, the time from process start to the
+first usable generator: importing orchestrator_demo, discovering patterns and
+fetching 'expense_approval'. Synthetic plugin directories of increasing size
+show how startup scales with the pattern library, comparing the lazy registry
+against eagerly loading every pattern up front.
+
+    python benchmarks/bench_cold_start.py [--plugins 0,10,50,100] [--runs 10]
+                                          [--json results.json]
+"""
+
+import os
+import sys
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each synthetic plugin does a little import-time work, like a real generator
+# module pulling in its templates and dependencies would
+PLUGIN_SOURCE = '''
+import json
+import hashlib
+
+SCHEMA = json.loads(json.dumps([{{"table": "t{index}_%d" % n}} for n in range(200)]))
+DIGEST = hashlib.sha256(json.dumps(SCHEMA).encode()).hexdigest()
+
+
+class Generator:
+    def generate(self, requirements):
+        return {{"name": "plugin_{index}", "path": "", "type": "plugin_{index}"}}
+'''
+
+# Runs in the child interpreter; prints seconds from start to first generator
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import orchestrator_demo
+registry = orchestrator_demo.PATTERNS
+registry.discover_entry_points()
+if {plugin_dir!r}:
+    registry.discover_plugins({plugin_dir!r})
+if {eager!r}:
+    for name in registry.available():
+        registry.get(name)
+registry.get('expense_approval')
+print(time.perf_counter() - start)
+'''
+
+
+def make_plugins(count: int) -> str:
+    directory = tempfile.mkdtemp(prefix='bench_plugins_')
+    for index in range(count):
+        with open(os.path.join(directory, f"pattern_{index:04d}.py"), 'w') as f:
+            f.write(PLUGIN_SOURCE.format(index=index))
+    return directory
+
+
+def cold_start(plugin_dir: str, eager: bool) -> float:
+    code = PROBE.format(root=ROOT, plugin_dir=plugin_dir, eager=eager)
+    # -B keeps plugin bytecode out of the temp dir so every run compiles cold
+    result = subprocess.run([sys.executable, '-B', '-c', code],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return float(result.stdout.strip())
+
+
+def bench(plugins: int, runs: int) -> List[Dict]:
+    plugin_dir = make_plugins(plugins) if plugins else ''
+    results = []
+    try:
+        for mode in ('lazy', 'eager'):
+            samples = sorted(cold_start(plugin_dir, mode == 'eager') for _ in range(runs))
+            results.append({
+                'mode': mode,
+                'plugins': plugins,
+                'median_ms': samples[len(samples) // 2] * 1000,
+                'min_ms': samples[0] * 1000,
+                'max_ms': samples[-1] * 1000,
+            })
+    finally:
+        if plugin_dir:
+            shutil.rmtree(plugin_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--plugins', default='0,10,50,100',
+                        help="comma-separated synthetic plugin counts")
+    parser.add_argument('--runs', type=int, default=10, help="fresh interpreters per measurement")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    results = []
+    for count in (int(count) for count in args.plugins.split(',') if count):
+        results.extend(bench(count, args.runs))
+
+    print(f"\n{'mode':<8}{'plugins':>9}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    print("-" * 49)
+    for r in results:
+        print(f"{r['mode']:<8}{r['plugins']:>9}{r['median_ms']:>12.2f}"
+              f"{r['min_ms']:>10.2f}{r['max_ms']:>10.2f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
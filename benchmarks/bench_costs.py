@@ -0,0 +1,104 @@
+"""
+Cost projection benchmark.
+
+Projects the governance document's what-if grid (user growth x Power BI
+Premium adoption x submitter plan) for synthetic user counts and reports
+scenarios per second, plus the time to render the Cost Projections section
+cold and from the memo. With NumPy installed the vectorized and pure-Python
+paths are compared side by side.
+
+    python benchmarks/bench_costs.py [--inputs 200] [--grid 3822,100000]
+                                     [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import (
+    COST_BI_ADOPTION, SUBMITTER_PLANS, clear_cost_projections, cost_scenarios, render_cost_projections,
+    use_numpy,
+)
+
+
+def synthetic_users(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [{'admin': rng.randint(1, 20), 'approver': rng.randint(5, 500), 'submitter': rng.randint(50, 50000)}
+            for _ in range(count)]
+
+
+def growth_steps(scenarios: int) -> List[float]:
+    """Growth factors giving roughly the requested grid size"""
+    steps = max(1, scenarios // (len(COST_BI_ADOPTION) * len(SUBMITTER_PLANS)))
+    return [0.5 + 4.5 * step / max(1, steps - 1) for step in range(steps)]
+
+
+def bench(users: List[Dict], scenarios: int, mode: str) -> Dict:
+    use_numpy(mode == 'numpy')
+    clear_cost_projections()
+    growth = growth_steps(scenarios)
+
+    start = time.perf_counter()
+    projected = 0
+    for counts in users:
+        projected += len(cost_scenarios(counts['admin'], counts['approver'], counts['submitter'], growth)['monthly'])
+    grid_s = time.perf_counter() - start
+
+    requirements = [{'users': counts, 'locale': 'en_US'} for counts in users]
+    start = time.perf_counter()
+    for r in requirements:
+        render_cost_projections(r)
+    cold_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for r in requirements:
+        render_cost_projections(r)
+    warm_s = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'grid': projected // len(users),
+        'scenarios_per_s': projected / grid_s,
+        'grid_ms': grid_s / len(users) * 1000,
+        'render_cold_ms': cold_s / len(users) * 1000,
+        'render_memo_us': warm_s / len(users) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--inputs', type=int, default=200, help="distinct user-count inputs")
+    parser.add_argument('--grid', default='3822,100000', help="comma-separated scenarios per input")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    modes = ['numpy', 'python'] if use_numpy() else ['python']
+    users = synthetic_users(args.inputs)
+    results = [bench(users, int(size), mode) for size in args.grid.split(',') if size for mode in modes]
+
+    print(f"\n{'mode':<8}{'scenarios':>11}{'scenarios/s':>14}{'grid ms':>10}{'render ms':>11}{'memo us':>10}")
+    print("-" * 64)
+    for r in results:
+        print(f"{r['mode']:<8}{r['grid']:>11,}{r['scenarios_per_s']:>14,.0f}{r['grid_ms']:>10.2f}"
+              f"{r['render_cold_ms']:>11.2f}{r['render_memo_us']:>10.1f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'inputs': args.inputs,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Deduplicated storage benchmark.
+
+Generates the same synthetic batch three ways: one directory per solution,
+a SolutionPack and a deduplicating BlobStore. For each it reports bytes
+written (apparent and allocated on disk), dedup ratio, bytes saved against
+the directory layout, write throughput, and latency percentiles for reading
+random artifacts back: a materialized file versus a referenced artifact
+reassembled from the store.
+
+    python benchmarks/bench_dedup.py [--solutions 1000,10000] [--reads 5000]
+                                     [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import ArtifactCache, ArtifactWriter, BlobStore, ExpenseApprovalGenerator, SolutionPack
+
+from bench_pipeline import synthetic_requirements
+
+LAYOUTS = ('directories', 'pack', 'dedup')
+
+
+def disk_usage(root: str) -> Dict:
+    apparent = allocated = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            info = os.stat(os.path.join(directory, name))
+            apparent += info.st_size
+            allocated += getattr(info, 'st_blocks', 0) * 512 or info.st_size
+    return {'apparent': apparent, 'allocated': allocated}
+
+
+def bench(layout: str, solutions: int, reads: int, seed: int = 0) -> Dict:
+    root = tempfile.mkdtemp(prefix='bench_dedup_')
+    try:
+        if layout == 'directories':
+            writer = ArtifactWriter('none')
+        else:
+            writer = (BlobStore if layout == 'dedup' else SolutionPack)(os.path.join(root, 'store'), 'none')
+        generator = ExpenseApprovalGenerator(os.path.join(root, 'solutions'), ArtifactCache(), writer)
+
+        start = time.perf_counter()
+        generated = [generator.generate(requirements) for requirements in synthetic_requirements(solutions)]
+        write_s = time.perf_counter() - start
+        usage = disk_usage(root)
+
+        if layout == 'directories':
+            def read(solution, artifact):
+                with open(os.path.join(solution['path'], artifact), 'rb') as f:
+                    return f.read()
+            artifacts = sorted(os.listdir(generated[0]['path']))
+        else:
+            def read(solution, artifact):
+                return writer.read(solution['name'], artifact)
+            artifacts = writer.artifacts(generated[0]['name'])
+
+        rng = random.Random(seed)
+        logical = sum(len(read(solution, artifact)) for solution in generated for artifact in artifacts)
+        latencies = []
+        for _ in range(reads):
+            solution, artifact = rng.choice(generated), rng.choice(artifacts)
+            t0 = time.perf_counter()
+            read(solution, artifact)
+            latencies.append(time.perf_counter() - t0)
+        latencies.sort()
+        stats = writer.stats() if layout == 'dedup' else {}
+        if layout != 'directories':
+            writer.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e6
+
+    return {
+        'layout': layout,
+        'solutions': solutions,
+        'logical_mb': logical / 1e6,
+        'apparent_mb': usage['apparent'] / 1e6,
+        'allocated_mb': usage['allocated'] / 1e6,
+        'dedup_ratio': stats.get('dedup_ratio', 1.0),
+        'solutions_per_s': solutions / write_s,
+        'read_p50_us': pct(0.50),
+        'read_p99_us': pct(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solutions', default='1000,10000', help="comma-separated batch sizes")
+    parser.add_argument('--reads', type=int, default=5000, help="random artifact reads per layout")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    results = []
+    for count in (int(count) for count in args.solutions.split(',') if count):
+        runs = [bench(layout, count, args.reads) for layout in LAYOUTS]
+        baseline = runs[0]['allocated_mb']
+        for run in runs:
+            run['saved_mb'] = baseline - run['allocated_mb']
+        results.extend(runs)
+
+    print(f"\n{'layout':<13}{'solutions':>10}{'logical MB':>12}{'written MB':>12}{'on disk MB':>12}"
+          f"{'saved MB':>10}{'dedup':>7}{'solutions/s':>13}{'read p50 us':>13}{'read p99 us':>13}")
+    print("-" * 115)
+    for r in results:
+        print(f"{r['layout']:<13}{r['solutions']:>10,}{r['logical_mb']:>12.1f}{r['apparent_mb']:>12.1f}"
+              f"{r['allocated_mb']:>12.1f}{r['saved_mb']:>10.1f}{r['dedup_ratio']:>6.1f}x"
+              f"{r['solutions_per_s']:>13,.0f}{r['read_p50_us']:>13.1f}{r['read_p99_us']:>13.1f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
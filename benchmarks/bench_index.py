@@ -0,0 +1,118 @@
+"""
+Solution index benchmark.
+
+Fills a SolutionIndex with synthetic solutions (four artifacts each, the way
+the generator records them) and reports insert throughput, database size and
+the latency of typical queries as the index grows to a million solutions:
+a numeric range with a text match, an artifact hash lookup and a time range.
+
+    python benchmarks/bench_index.py [--solutions 10000,100000,1000000] [--repeat 5]
+                                     [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import shutil
+import platform
+import argparse
+import tempfile
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import ARTIFACT_INPUTS, SolutionIndex
+
+from bench_pipeline import synthetic_requirements
+
+QUERIES = {
+    'levels>=3 & SOX': ['approval_levels>=3', 'compliance~SOX'],
+    'sha256 lookup': None,  # filled in with a real artifact hash
+    'last hour': None,      # filled in relative to the synthetic timestamps
+}
+
+
+def fill(index: SolutionIndex, count: int, start: float) -> str:
+    """Add count synthetic solutions; returns one governance.md hash to look up"""
+    requirements = synthetic_requirements(min(count, 10000))
+    shared = {name: {'sha256': hashlib.sha256(name.encode()).hexdigest(), 'bytes': 1300}
+              for name in ARTIFACT_INPUTS}
+    probe = None
+    for n in range(count):
+        digest = hashlib.sha256(b"%d" % n).hexdigest()
+        artifacts = dict(shared, **{'governance.md': {'sha256': digest, 'bytes': 6100 + n % 100}})
+        index.add(f"ExpenseApproval_{n:08d}", 'expense_approval', f"sample_output/ExpenseApproval_{n:08d}",
+                  requirements[n % len(requirements)], artifacts, start + n * 0.01, 0.0004)
+        if n == count // 2:
+            probe = digest
+    index.flush()
+    return probe
+
+
+def bench(count: int, repeat: int) -> Dict:
+    directory = tempfile.mkdtemp(prefix='bench_index_')
+    path = os.path.join(directory, 'solutions.db')
+    try:
+        index = SolutionIndex(path)
+        start = 1.7e9
+        t0 = time.perf_counter()
+        probe = fill(index, count, start)
+        insert_s = time.perf_counter() - t0
+        size = sum(os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix))
+
+        queries = dict(QUERIES)
+        queries['sha256 lookup'] = [('sha256', '=', probe)]
+        queries['last hour'] = [('generated_at', '>=', start + count * 0.01 - 3600)]
+        latencies, matches = {}, {}
+        for name, filters in queries.items():
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                matches[name] = index.count(filters)
+                index.query(filters, limit=50)
+                samples.append(time.perf_counter() - t0)
+            latencies[name] = sorted(samples)[len(samples) // 2] * 1000
+        index.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'solutions': count,
+        'inserts_per_s': count / insert_s,
+        'db_mb': size / 1e6,
+        'query_ms': latencies,
+        'matches': matches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solutions', default='10000,100000,1000000', help="comma-separated index sizes")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per query (median reported)")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    results = [bench(int(count), args.repeat) for count in args.solutions.split(',') if count]
+
+    names = list(QUERIES)
+    print(f"\n{'solutions':>10}{'inserts/s':>11}{'DB MB':>8}" + "".join(f"{name + ' ms':>20}" for name in names))
+    print("-" * (29 + 20 * len(names)))
+    for r in results:
+        print(f"{r['solutions']:>10,}{r['inserts_per_s']:>11,.0f}{r['db_mb']:>8.0f}"
+              + "".join(f"{r['query_ms'][name]:>20.2f}" for name in names))
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Memory regression benchmark.
+
+Generates a synthetic batch in two long-running shapes: one generator called
+directly, and one orchestrator answering every conversation in turn, as a
+service worker would. After a short discarded warmup run, a first pass runs under plain tracemalloc, sampling
+traced memory after every solution, for steady-state growth per solution
+once caches are warm and the memory retained by the whole run. A second pass
+with memory accounting on (TRACER.track_memory) gives peak allocation and
+bytes retained per solution, with the per-stage breakdown in --json.
+
+Exits with status 1 when any figure exceeds its threshold, so it can gate
+changes that make long-running workers bloat:
+
+    python benchmarks/bench_memory.py [--solutions 2000] [--max-alloc-kb 32]
+                                      [--max-growth-bytes 64] [--max-retained-mb 8]
+                                      [--json results.json]
+"""
+
+import os
+import gc
+import sys
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from array import array
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import (
+    OUTPUT, TRACER, ArtifactCache, ArtifactWriter, ExpenseApprovalGenerator, PowerPlatformOrchestrator,
+    TranscriptInput, memory_growth, memory_report,
+)
+
+from bench_pipeline import synthetic_requirements
+from bench_replay import QUESTIONS
+
+WORKLOADS = ('generator', 'orchestrator')
+
+# Solutions generated and thrown away before measuring, so one-time costs
+# (lazy imports, compiled templates, module-level memos) stay out of the figures
+WARMUP_SOLUTIONS = 50
+
+
+def run(workload: str, output_dir: str, requirements: List[Dict], traced=None):
+    """
+    Generate every solution; traced, if given, receives traced memory after
+    each. Returns the orchestrator, which holds everything the run kept.
+    """
+    generator = ExpenseApprovalGenerator(output_dir, ArtifactCache(), ArtifactWriter('none'))
+    orchestrator = PowerPlatformOrchestrator(generators={'expense_approval': generator})
+    for n, r in enumerate(requirements):
+        if workload == 'generator':
+            generator.generate(r)
+        else:
+            orchestrator.input_source = TranscriptInput(
+                {'answers': [[question, r[field], 0] for question, field in QUESTIONS]})
+            orchestrator.start_conversation()
+        if traced is not None:
+            traced[n] = tracemalloc.get_traced_memory()[0]
+    return orchestrator
+
+
+def bench(workload: str, solutions: int, warmup: float) -> Dict:
+    requirements = synthetic_requirements(solutions)
+    traced = array('q', bytes(8 * solutions))  # preallocated, so sampling allocates nothing
+    output_dir = tempfile.mkdtemp(prefix='bench_memory_')
+    try:
+        run(workload, os.path.join(output_dir, 'warmup'), requirements[:WARMUP_SOLUTIONS])
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            worker = run(workload, os.path.join(output_dir, 'growth'), requirements, traced)
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - baseline
+            del worker
+        finally:
+            tracemalloc.stop()
+
+        TRACER.track_memory()
+        try:
+            run(workload, os.path.join(output_dir, 'accounting'), requirements)
+            report = memory_report(TRACER, warmup)
+        finally:
+            tracemalloc.stop()
+            TRACER.enabled = TRACER.memory = False
+            TRACER.drain()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    report['workload'] = workload
+    report['growth_per_solution_bytes'] = memory_growth(list(traced), warmup)
+    report['retained_mb'] = retained / 1e6
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solutions', type=int, default=2000, help="solutions per workload")
+    parser.add_argument('--warmup', type=float, default=0.5,
+                        help="share of the run left out of the growth fit while caches fill")
+    parser.add_argument('--max-alloc-kb', type=float, default=32.0,
+                        help="fail above this peak allocation per solution")
+    parser.add_argument('--max-growth-bytes', type=float, default=64.0,
+                        help="fail above this steady-state growth per solution")
+    parser.add_argument('--max-retained-mb', type=float, default=8.0,
+                        help="fail when the whole run retains more than this")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    OUTPUT.mode = 'silent'
+    results = [bench(workload, args.solutions, args.warmup) for workload in WORKLOADS]
+
+    failures = []
+    for r in results:
+        for key, limit, label in (('alloc_per_solution_kb', args.max_alloc_kb, "KB allocated per solution"),
+                                  ('growth_per_solution_bytes', args.max_growth_bytes, "bytes growth per solution"),
+                                  ('retained_mb', args.max_retained_mb, "MB retained")):
+            if r[key] > limit:
+                failures.append(f"{r['workload']}: {r[key]:,.1f} {label} (limit {limit:,.1f})")
+
+    print(f"\n{'workload':<14}{'solutions':>10}{'alloc KB':>10}{'retained B':>12}{'growth B':>10}"
+          f"{'retained MB':>13}")
+    print("-" * 69)
+    for r in results:
+        print(f"{r['workload']:<14}{r['solutions']:>10,}{r['alloc_per_solution_kb']:>10.1f}"
+              f"{r['retained_per_solution_bytes']:>12.0f}{r['growth_per_solution_bytes']:>10.0f}"
+              f"{r['retained_mb']:>13.2f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'thresholds': {
+                'alloc_per_solution_kb': args.max_alloc_kb,
+                'growth_per_solution_bytes': args.max_growth_bytes,
+                'retained_mb': args.max_retained_mb,
+            },
+            'results': results,
+            'failures': failures,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if failures:
+        print("\nMemory regression:")
+        for failure in failures:
+            print(f"  FAIL {failure}")
+        sys.exit(1)
+    print("\nAll memory thresholds met.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Generation pipeline benchmark.
+
+Drives the individual artifact builders, JSON serialization and end-to-end
+ExpenseApprovalGenerator.generate with synthetic requirement sets, reporting
+latency percentiles, throughput, peak RSS and bytes written per stage.
+
+    python benchmarks/bench_pipeline.py [--sizes 1,100,10000,100000]
+                                        [--max-generate 10000] [--json results.json]
+
+End-to-end runs compare serial, process-parallel and async (overlapped I/O)
+generation, cached and uncached; they write real solutions into a temporary
+directory, so they are capped by --max-generate. Use --durability solution
+to see how async overlap hides fsync latency.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import asyncio
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import (
+    ArtifactCache, ArtifactWriter, ExpenseApprovalGenerator, GENERATOR_VERSION,
+    DURABILITY_LEVELS, PowerPlatformOrchestrator, generate_parallel, iter_json,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROBLEMS = [
+    "Expense approvals take weeks", "No visibility into pending requests",
+    "Receipts are lost in email", "Managers approve outside policy",
+    "Finance re-keys every claim", "Travel costs exceed budget",
+]
+PAIN_POINTS = [
+    "Manual approval tracking", "Delays in approvals", "Lack of visibility",
+    "Spreadsheet reconciliation", "Missing audit trail",
+]
+COMPLIANCE = [
+    "Standard corporate policy", "SOX", "SOX, cost center tracking",
+    "GDPR", "Spending limits per role",
+]
+
+
+def synthetic_requirements(count: int, seed: int = 0) -> List[Dict]:
+    """Deterministic requirement records shaped like normalize_requirements output"""
+    rng = random.Random(seed)
+    return [
+        {
+            'business_problem': f"{rng.choice(PROBLEMS)} (unit {index})",
+            'pain_point': rng.choice(PAIN_POINTS),
+            'approval_levels': str(rng.randint(1, 5)),
+            'compliance': rng.choice(COMPLIANCE),
+        }
+        for index in range(count)
+    ]
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(stage: str, size: int, latencies: List[float], total: float,
+              bytes_written: int, children: bool = False) -> Dict:
+    ordered = sorted(latencies)
+
+    def pct(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+    return {
+        'stage': stage,
+        'size': size,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'max_ms': ordered[-1] * 1000 if ordered else 0.0,
+        'throughput_per_s': size / total if total > 0 else 0.0,
+        'total_s': total,
+        'bytes_written': bytes_written,
+        'peak_rss_mb': peak_rss_mb(children),
+    }
+
+
+def time_calls(stage: str, items: List, call: Callable) -> Dict:
+    """Time call(item) for every item, counting any bytes the call returns"""
+    latencies = []
+    produced = 0
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        data = call(item)
+        latencies.append(time.perf_counter() - t0)
+        if isinstance(data, bytes):
+            produced += len(data)
+    return summarize(stage, len(items), latencies, time.perf_counter() - start, produced)
+
+
+def directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def bench_builders(size: int) -> List[Dict]:
+    generator = ExpenseApprovalGenerator()
+    requirements = synthetic_requirements(size)
+    app_def = generator._generate_app_definition(requirements[0])
+    roles = generator._generate_security_roles()
+
+    # The JSON builders return lazy values that only do their work when
+    # serialized, so those stages time building through to the file bytes
+    return [
+        time_calls('app_definition', requirements,
+                   lambda r: b"".join(iter_json(generator._generate_app_definition(r)))),
+        time_calls('governance', requirements,
+                   lambda r: generator._generate_governance(r).encode('utf-8')),
+        time_calls('security_roles', requirements,
+                   lambda r: b"".join(iter_json(generator._generate_security_roles(r)))),
+        time_calls('json_serialization', requirements,
+                   lambda r: b"".join(iter_json(app_def)) + b"".join(iter_json(roles))),
+    ]
+
+
+def bench_generate(size: int, workers: int, durability: str, concurrency: int) -> List[Dict]:
+    requirements = synthetic_requirements(size)
+    results = []
+
+    for mode in ('serial-uncached', 'serial-cached', 'parallel', 'async'):
+        output_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+        try:
+            if mode == 'parallel':
+                start = time.perf_counter()
+                manifest = generate_parallel(
+                    iter(requirements), workers=workers, output_dir=output_dir,
+                    durability=durability
+                )
+                total = time.perf_counter() - start
+                latencies = [solution['seconds'] for solution in manifest['solutions']]
+                children = True
+            elif mode == 'async':
+                generator = ExpenseApprovalGenerator(output_dir, None, ArtifactWriter(durability))
+                start = time.perf_counter()
+                solutions = asyncio.run(PowerPlatformOrchestrator().generate_many(
+                    requirements, concurrency, generators={'expense_approval': generator}
+                ))
+                generator.writer.flush()
+                total = time.perf_counter() - start
+                latencies = [solution['seconds'] for solution in solutions]
+                children = False
+            else:
+                cache = ArtifactCache() if mode == 'serial-cached' else None
+                generator = ExpenseApprovalGenerator(output_dir, cache, ArtifactWriter(durability))
+                latencies = []
+                start = time.perf_counter()
+                for item in requirements:
+                    t0 = time.perf_counter()
+                    generator.generate(item)
+                    latencies.append(time.perf_counter() - t0)
+                generator.writer.flush()
+                total = time.perf_counter() - start
+                children = False
+
+            result = summarize(f"generate[{mode}]", size, latencies, total,
+                               directory_bytes(output_dir), children)
+            result['workers'] = workers if mode == 'parallel' else 1
+            result['concurrency'] = concurrency if mode == 'async' else 1
+            results.append(result)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    return results
+
+
+def print_table(results: List[Dict]):
+    print(f"\n{'stage':<28}{'size':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'ops/s':>12}{'MB written':>12}{'peak RSS MB':>13}")
+    print("-" * 103)
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else "n/a"
+        print(f"{r['stage']:<28}{r['size']:>8}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+              f"{r['p99_ms']:>10.3f}{r['throughput_per_s']:>12,.0f}"
+              f"{r['bytes_written'] / 1e6:>12.2f}{rss:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,100,10000,100000',
+                        help="comma-separated requirement set sizes")
+    parser.add_argument('--max-generate', type=int, default=10000,
+                        help="largest size to run through end-to-end generate()")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--durability', choices=DURABILITY_LEVELS, default='none')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="solutions in flight for the async generate mode")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = []
+    for size in sizes:
+        results.extend(bench_builders(size))
+        if size <= args.max_generate:
+            results.extend(bench_generate(size, args.workers, args.durability, args.concurrency))
+
+    print_table(results)
+
+    if args.json:
+        report = {
+            'generator_version': GENERATOR_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'durability': args.durability,
+            'concurrency': args.concurrency,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Privilege matrix benchmark.
+
+Builds synthetic security role sets of roles x tables (6 privileges each) as a
+PrivilegeMatrix and times a policy check (Organization-wide delete outside the
+admin role), a segregation-of-duties check, a diff against a copy with a few
+edits and streaming the matrix back to security_roles.json. With NumPy
+installed the vectorized and pure-Python paths are compared side by side.
+
+    python benchmarks/bench_privileges.py [--sizes 100x100,1000x100,1000x1000]
+                                          [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import PRIVILEGES, SCOPE_LEVELS, PrivilegeMatrix, iter_json, use_numpy
+
+
+def synthetic_matrix(roles: int, tables: int, seed: int = 0) -> PrivilegeMatrix:
+    """Mostly User-scoped roles with a sprinkling of wider grants"""
+    rng = random.Random(seed)
+    matrix = PrivilegeMatrix([f"Role {r}" for r in range(roles)], [f"cr_table{t}" for t in range(tables)])
+    cells = bytearray(b"\x01" * len(matrix.cells))
+    for _ in range(len(cells) // 100):
+        cells[rng.randrange(len(cells))] = rng.randrange(len(SCOPE_LEVELS))
+    matrix.cells[:] = cells
+    matrix.listed[:] = b"\x01" * len(matrix.listed)
+    return matrix
+
+
+def edited_copy(matrix: PrivilegeMatrix, edits: int, seed: int = 1) -> PrivilegeMatrix:
+    rng = random.Random(seed)
+    other = PrivilegeMatrix(matrix.roles, matrix.tables, matrix.role_info, matrix.extra)
+    other.cells[:] = matrix.cells
+    other.listed[:] = matrix.listed
+    for _ in range(edits):
+        other.grant(rng.choice(matrix.roles), rng.choice(matrix.tables),
+                    {rng.choice(PRIVILEGES): rng.choice(SCOPE_LEVELS)})
+    return other
+
+
+def timed(step):
+    start = time.perf_counter()
+    result = step()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(roles: int, tables: int, mode: str) -> Dict:
+    # Matrices pick their backend when built, so force it before building any
+    use_numpy(mode == 'numpy')
+
+    matrix, build_ms = timed(lambda: synthetic_matrix(roles, tables))
+    other = edited_copy(matrix, 100)
+    violations, check_ms = timed(lambda: matrix.violations('delete', 'BusinessUnit', ['Role 0']))
+    conflicts, sod_ms = timed(lambda: matrix.conflicts(('create', 'BusinessUnit'), ('write', 'Organization')))
+    diff, diff_ms = timed(lambda: matrix.diff(other))
+    output_bytes, serialize_ms = timed(lambda: sum(len(chunk) for chunk in iter_json(matrix)))
+
+    return {
+        'mode': mode,
+        'roles': roles,
+        'tables': tables,
+        'cells': roles * tables * len(PRIVILEGES),
+        'build_ms': build_ms,
+        'check_ms': check_ms,
+        'sod_ms': sod_ms,
+        'diff_ms': diff_ms,
+        'serialize_ms': serialize_ms,
+        'violations': len(violations),
+        'conflicts': len(conflicts),
+        'changes': len(diff['changes']),
+        'output_mb': output_bytes / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100x100,1000x100,1000x1000',
+                        help="comma-separated ROLESxTABLES sizes")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    modes = ['numpy', 'python'] if use_numpy() else ['python']
+    results = []
+    for size in (size for size in args.sizes.split(',') if size):
+        roles, tables = (int(n) for n in size.split('x'))
+        results.extend(bench(roles, tables, mode) for mode in modes)
+
+    print(f"\n{'mode':<8}{'roles':>7}{'tables':>8}{'build ms':>10}{'check ms':>10}{'SoD ms':>9}"
+          f"{'diff ms':>9}{'serialize ms':>14}{'output MB':>11}")
+    print("-" * 86)
+    for r in results:
+        print(f"{r['mode']:<8}{r['roles']:>7}{r['tables']:>8}{r['build_ms']:>10.1f}{r['check_ms']:>10.1f}"
+              f"{r['sod_ms']:>9.1f}{r['diff_ms']:>9.1f}{r['serialize_ms']:>14.0f}{r['output_mb']:>11.1f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
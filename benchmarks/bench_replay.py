@@ -0,0 +1,101 @@
+"""
+Conversation replay load benchmark.
+
+Records synthetic conversations to a transcript file (answers with
+log-normally distributed think times, like people typing) and replays them
+through the full conversation path with replay_transcripts at several
+concurrencies. Reports conversations per second and end-to-end latency
+percentiles, plus latency excluding think time when --pace is above zero.
+
+    python benchmarks/bench_replay.py [--conversations 2000] [--concurrency 1,8,32]
+                                      [--pace 0] [--json results.json]
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import (
+    ArtifactCache, ArtifactWriter, ExpenseApprovalGenerator, append_transcript, load_transcripts,
+    replay_transcripts,
+)
+
+from bench_pipeline import synthetic_requirements
+
+QUESTIONS = (('problem', 'business_problem'), ('pain_point', 'pain_point'),
+             ('approval_levels', 'approval_levels'), ('compliance', 'compliance'))
+
+
+def synthetic_transcripts(path: str, count: int, seed: int = 0, think_seconds: float = 2.0):
+    """Write count conversations to path, with median think_seconds per answer"""
+    rng = random.Random(seed)
+    for index, requirements in enumerate(synthetic_requirements(count, seed)):
+        answers = [[question, requirements[field], round(rng.lognormvariate(0, 0.75) * think_seconds, 3)]
+                   for question, field in QUESTIONS]
+        append_transcript(path, {'started': 1.7e9 + index, 'answers': answers})
+
+
+def bench(path: str, concurrency: int, pace: float) -> Dict:
+    output_dir = tempfile.mkdtemp(prefix='bench_replay_')
+    try:
+        generator = ExpenseApprovalGenerator(output_dir, ArtifactCache(), ArtifactWriter('none'))
+        summary = replay_transcripts(load_transcripts(path), concurrency, pace,
+                                     generators={'expense_approval': generator})
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    summary.pop('results')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--conversations', type=int, default=2000)
+    parser.add_argument('--concurrency', default='1,8,32', help="comma-separated concurrent conversations")
+    parser.add_argument('--pace', type=float, default=0.0,
+                        help="think-time scale: 0 replays as fast as possible, 0.01 at 1/100 speed")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench_transcripts_')
+    path = os.path.join(directory, 'transcripts.jsonl')
+    try:
+        synthetic_transcripts(path, args.conversations)
+        transcript_bytes = os.path.getsize(path)
+        results = [bench(path, int(concurrency), args.pace)
+                   for concurrency in args.concurrency.split(',') if concurrency]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"\nTranscript file: {transcript_bytes / 1e3:.0f} KB for {args.conversations:,} conversations "
+          f"({transcript_bytes / max(1, args.conversations):.0f} bytes each)")
+    print(f"\n{'clients':>8}{'conversations/s':>17}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'busy p50 ms':>13}{'busy p99 ms':>13}")
+    print("-" * 81)
+    for r in results:
+        print(f"{r['concurrency']:>8}{r['conversations_per_second']:>17,.0f}{r['latency']['p50_ms']:>10.2f}"
+              f"{r['latency']['p95_ms']:>10.2f}{r['latency']['p99_ms']:>10.2f}"
+              f"{r['processing']['p50_ms']:>13.2f}{r['processing']['p99_ms']:>13.2f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'transcript_bytes': transcript_bytes,
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
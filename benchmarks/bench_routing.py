@@ -0,0 +1,113 @@
+"""
+Pattern routing benchmark.
+
+Times PatternRouter index construction, single-requirement scoring and bulk
+scoring against the built-in patterns plus a configurable number of synthetic
+pattern descriptors, reporting per-query latency percentiles and throughput.
+
+    python benchmarks/bench_routing.py [--patterns 5,100,1000] [--queries 10000]
+                                       [--json results.json]
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import PATTERNS, PatternRegistry, PatternRouter
+
+from bench_pipeline import synthetic_requirements
+
+VOCABULARY = (
+    "approval request inventory device form survey sync api report dashboard vendor "
+    "contract invoice onboarding employee facility booking room ticket incident "
+    "maintenance audit risk policy training certification leave timesheet project"
+).split()
+
+
+def registry_with(count: int, seed: int = 0) -> PatternRegistry:
+    """The built-in patterns plus synthetic ones up to count descriptors in total"""
+    rng = random.Random(seed)
+    registry = PatternRegistry()
+    for name in PATTERNS:
+        registry.register(name, None, PATTERNS.description(name), PATTERNS._keywords[name])
+    for index in range(max(0, count - len(registry))):
+        words = " ".join(rng.sample(VOCABULARY, 8))
+        registry.register(f"pattern_{index}", None, f"Synthetic pattern {index}", words)
+    return registry
+
+
+def bench(patterns: int, queries: int) -> Dict:
+    router = PatternRouter(registry_with(patterns))
+    start = time.perf_counter()
+    router.build()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Both passes keep their rankings, as a caller routing the batch would
+    batch = synthetic_requirements(queries)
+    latencies, ranked = [], []
+    gc.collect()
+    for requirements in batch:
+        t0 = time.perf_counter()
+        ranked.append(router.rank(requirements))
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    del ranked
+
+    router.rank_many(batch[:1])  # one-time NumPy import and postings arrays, like build() above
+    gc.collect()
+    start = time.perf_counter()
+    ranked = router.rank_many(batch)
+    bulk = time.perf_counter() - start
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e6
+
+    return {
+        'patterns': patterns,
+        'queries': queries,
+        'build_ms': build_ms,
+        'p50_us': pct(0.50),
+        'p99_us': pct(0.99),
+        'single_per_s': queries / sum(latencies),
+        'bulk_per_s': queries / bulk if bulk > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--patterns', default='5,100,1000',
+                        help="comma-separated registered pattern counts")
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    results = [bench(int(count), args.queries) for count in args.patterns.split(',') if count]
+
+    print(f"\n{'patterns':>9}{'build ms':>11}{'p50 us':>10}{'p99 us':>10}"
+          f"{'single/s':>12}{'bulk/s':>12}")
+    print("-" * 64)
+    for r in results:
+        print(f"{r['patterns']:>9}{r['build_ms']:>11.2f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}"
+              f"{r['single_per_s']:>12,.0f}{r['bulk_per_s']:>12,.0f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Schema generation scaling benchmark.
+
+Builds app definitions from synthetic Dataverse models of increasing size
+(100 attributes per table by default) and times schema construction and JSON
+serialization separately, with the peak Python heap (tracemalloc) of each
+step and the retained size of the compact schema. A plain list-of-dicts model
+of the same size is measured alongside for comparison.
+
+--rss generates complete solutions in fresh processes and reports the growth
+in peak RSS while writing them: buffered (each document serialized in memory
+first) against streamed output, indented and compact. Written MB counts the
+app definition and security roles; the manifest is written but not counted.
+
+    python benchmarks/bench_schema.py [--tables 10,100,500,1000] [--attributes 100]
+                                      [--rss] [--json results.json]
+"""
+
+import os
+import sys
+import gc
+import glob
+import json
+import time
+import random
+import platform
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import (
+    ATTRIBUTE_TYPES, SOLUTION_MANIFEST, ArtifactWriter, ExpenseApprovalGenerator,
+)
+
+from bench_pipeline import peak_rss_mb
+
+RSS_MODES = ('buffered', 'streamed', 'compact')
+
+
+def synthetic_tables(tables: int, attributes: int, seed: int = 0) -> List[Dict]:
+    """Table specs as they would arrive in a requirements record"""
+    rng = random.Random(seed)
+    plain_types = [t for t in ATTRIBUTE_TYPES if t != 'Lookup']
+    specs = []
+    for t in range(tables):
+        columns = []
+        for a in range(attributes):
+            if t and rng.random() < 0.05:
+                column = {"name": f"cr_ref{a}", "type": "Lookup", "target": f"cr_table{rng.randrange(t)}"}
+            else:
+                column = {"name": f"cr_field{a}", "type": rng.choice(plain_types)}
+                if rng.random() < 0.3:
+                    column["required"] = True
+            columns.append(column)
+        specs.append({"logicalName": f"cr_table{t}", "displayName": f"Table {t}", "attributes": columns})
+    return specs
+
+
+def jsonable(value):
+    """json.dumps default hook for the generator's lazy values (schemas, row generators)"""
+    return value.to_jsonable() if hasattr(value, 'to_jsonable') else list(value)
+
+
+def measure(step):
+    """
+    Run step once for time and once under tracemalloc (which slows allocation)
+    for memory; returns (result, seconds, peak MB, retained MB).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    step()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    result = step()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1e6, retained / 1e6
+
+
+def bench(tables: int, attributes: int) -> Dict:
+    generator = ExpenseApprovalGenerator()
+    requirements = {'business_problem': "Scaling benchmark", 'tables': synthetic_tables(tables, attributes)}
+
+    app_definition, build_s, build_peak, schema_mb = measure(
+        lambda: generator._generate_app_definition(requirements))
+    data, serialize_s, serialize_peak, _ = measure(
+        lambda: generator._build_artifact('app_definition.json', requirements))
+    # The same model held as nested dicts, as the builder used to produce it
+    _, _, _, dicts_mb = measure(lambda: json.loads(data))
+
+    return {
+        'tables': tables,
+        'attributes': tables * attributes,
+        'build_s': build_s,
+        'serialize_s': serialize_s,
+        'build_peak_mb': build_peak,
+        'serialize_peak_mb': serialize_peak,
+        'schema_mb': schema_mb,
+        'dicts_mb': dicts_mb,
+        'output_mb': len(data) / 1e6,
+        'attributes_per_s': tables * attributes / (build_s + serialize_s),
+    }
+
+
+def generate_once(mode: str, tables: int, attributes: int) -> Dict:
+    """Child-process body for --rss: write one solution and report peak RSS growth"""
+    requirements = {'business_problem': "Scaling benchmark", 'pain_point': "n/a",
+                    'approval_levels': "2", 'compliance': "n/a",
+                    'tables': synthetic_tables(tables, attributes)}
+    output_dir = tempfile.mkdtemp(prefix='bench_schema_')
+    try:
+        gc.collect()
+        baseline = peak_rss_mb()
+        generator = ExpenseApprovalGenerator(output_dir, None, ArtifactWriter('none'),
+                                             compact=(mode == 'compact'))
+        start = time.perf_counter()
+        if mode == 'buffered':
+            # Serialize everything in memory first, as json.dump(obj, f, indent=2) does
+            name, path = generator._create_solution_dir()
+            documents = {
+                artifact: generator._artifact_content(artifact, requirements)
+                for artifact in ('app_definition.json', 'security_roles.json')
+            }
+            documents[SOLUTION_MANIFEST] = {'solution': name, 'requirements': requirements}
+            for artifact, content in documents.items():
+                with open(os.path.join(path, artifact), 'wb') as f:
+                    f.write(json.dumps(content, indent=2, default=jsonable).encode('utf-8'))
+        else:
+            generator.generate(requirements)
+        seconds = time.perf_counter() - start
+        written = sum(os.path.getsize(path) for pattern in ('*.json',)
+                      for path in glob.glob(os.path.join(output_dir, '*', pattern))
+                      if not path.endswith(SOLUTION_MANIFEST))
+        return {'mode': mode, 'tables': tables, 'attributes': tables * attributes,
+                'seconds': seconds, 'rss_growth_mb': peak_rss_mb() - baseline,
+                'written_mb': written / 1e6}
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def bench_rss(tables: int, attributes: int) -> List[Dict]:
+    results = []
+    for mode in RSS_MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, str(tables), str(attributes)],
+            stdout=subprocess.PIPE, check=True, universal_newlines=True
+        ).stdout
+        results.append(json.loads(output))
+    return results
+
+
+def main():
+    if sys.argv[1:2] == ['--child']:
+        mode, tables, attributes = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+        print(json.dumps(generate_once(mode, tables, attributes)))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', default='10,100,500,1000',
+                        help="comma-separated table counts")
+    parser.add_argument('--attributes', type=int, default=100, help="attributes per table")
+    parser.add_argument('--rss', action='store_true',
+                        help="also compare peak RSS of buffered vs streamed solution writes")
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.tables.split(',') if count]
+
+    # Children inherit the parent's peak RSS on Linux, so spawn them while
+    # this process is still small
+    rss = []
+    if args.rss:
+        for count in counts:
+            rss.extend(bench_rss(count, args.attributes))
+
+    results = [bench(count, args.attributes) for count in counts]
+
+    print(f"\n{'tables':>7}{'attributes':>12}{'build s':>9}{'serialize s':>13}{'peak MB':>9}"
+          f"{'schema MB':>11}{'dicts MB':>10}{'output MB':>11}{'attrs/s':>11}")
+    print("-" * 93)
+    for r in results:
+        print(f"{r['tables']:>7}{r['attributes']:>12,}{r['build_s']:>9.3f}{r['serialize_s']:>13.3f}"
+              f"{max(r['build_peak_mb'], r['serialize_peak_mb']):>9.1f}{r['schema_mb']:>11.1f}"
+              f"{r['dicts_mb']:>10.1f}{r['output_mb']:>11.1f}{r['attributes_per_s']:>11,.0f}")
+
+    if rss:
+        print(f"\n{'mode':<10}{'tables':>7}{'attributes':>12}{'seconds':>9}"
+              f"{'RSS growth MB':>15}{'written MB':>12}")
+        print("-" * 65)
+        for r in rss:
+            print(f"{r['mode']:<10}{r['tables']:>7}{r['attributes']:>12,}{r['seconds']:>9.2f}"
+                  f"{r['rss_growth_mb']:>15.1f}{r['written_mb']:>12.1f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+            'rss': rss,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
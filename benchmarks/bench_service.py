@@ -0,0 +1,131 @@
+"""
+Generation service load benchmark.
+
+Starts GenerationService on a local port and drives it with concurrent
+keep-alive HTTP clients, reporting client-side latency percentiles,
+throughput, how many requests were turned away with 429, and the service's
+own queue-depth and latency metrics.
+
+    python benchmarks/bench_service.py [--requests 2000] [--concurrency 1,16,128]
+                                       [--workers 4] [--queue-size 64] [--json results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import platform
+import argparse
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orchestrator_demo import GenerationService
+
+from bench_pipeline import synthetic_requirements
+
+
+async def client(port: int, payloads: List[bytes], latencies: List[float], statuses: Dict):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for body in payloads:
+            start = time.perf_counter()
+            writer.write(b"POST /solutions HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def bench(requests: int, concurrency: int, workers: int, queue_size: int) -> Dict:
+    output_dir = tempfile.mkdtemp(prefix='bench_service_')
+    service = GenerationService(output_dir, workers, queue_size, durability='none')
+    try:
+        server = await service.start('127.0.0.1:0')
+        port = server.sockets[0].getsockname()[1]
+        payloads = [json.dumps(r).encode('utf-8') for r in synthetic_requirements(requests)]
+        latencies, statuses = [], {}
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client(port, payloads[offset::concurrency], latencies, statuses)
+            for offset in range(min(concurrency, requests))
+        ))
+        total = time.perf_counter() - start
+        metrics = service.metrics()
+        await service.stop()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    latencies.sort()
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'workers': workers,
+        'queue_size': queue_size,
+        'ok': statuses.get(200, 0),
+        'rejected': statuses.get(429, 0),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'solutions_per_s': statuses.get(200, 0) / total if total > 0 else 0.0,
+        'service_metrics': metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', default='1,16,128',
+                        help="comma-separated concurrent client connections")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=64)
+    parser.add_argument('--json', metavar='PATH', help="write machine-readable results here")
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(bench(args.requests, int(concurrency), args.workers, args.queue_size))
+        for concurrency in args.concurrency.split(',') if concurrency
+    ]
+
+    print(f"\n{'clients':>8}{'ok':>8}{'429':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'solutions/s':>13}{'svc p99 ms':>12}")
+    print("-" * 79)
+    for r in results:
+        print(f"{r['concurrency']:>8}{r['ok']:>8}{r['rejected']:>8}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['solutions_per_s']:>13,.0f}"
+              f"{r['service_metrics']['latency']['p99_ms']:>12.2f}")
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,115 +9,565 @@ Full enterprise version available for qualified organizations.
 """
 
 import sys
-import io
 import os
+import io
+import re
+import csv
+import json
+import math
+import time
+import hashlib
+import functools
+import mmap
+import zlib
+import threading
+import uuid
+import argparse
+import importlib
 from datetime import datetime
-from typing import Dict, List
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-# Windows console encoding fix
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+# Requirement fields gathered by the conversation, with the defaults applied
+# when an answer is left blank. business_problem has no default.
+REQUIREMENT_DEFAULTS = {
+    'business_problem': None,
+    'pain_point': "Manual approval tracking",
+    'approval_levels': "2",
+    'compliance': "Standard corporate policy",
+}
 
-class ExpenseApprovalGenerator:
+# Structured requirement fields that only batch files and the service supply:
+# 'tables' is a list of Dataverse table specs (batch files may give a path to a
+# JSON file of them instead),
+# 'users' maps admin/approver/submitter to user counts for cost projections and
+# 'locale' picks how amounts are formatted (see CURRENCY_FORMATS)
+OPTIONAL_REQUIREMENTS = ('tables', 'users', 'locale')
+
+# Bumped whenever generated output changes, so cached artifacts are not reused
+GENERATOR_VERSION = "1.1.1"
+
+# Requirement fields each artifact is built from. Artifacts that ignore the
+# requirements share one cache entry across every request.
+ARTIFACT_INPUTS = {
+    'app_definition.json': ('tables',),
+    'governance.md': tuple(REQUIREMENT_DEFAULTS) + ('users', 'locale'),
+    'security_roles.json': ('tables',),
+}
+
+# Artifacts whose bytes depend only on ARTIFACT_INPUTS (governance.md also
+# embeds the generation time, so it is never served from the cache)
+CACHEABLE_ARTIFACTS = ('app_definition.json', 'security_roles.json')
+
+SOLUTION_MANIFEST = "solution_manifest.json"
+
+
+def _structured_digest(value) -> str:
     """
-    Generates complete expense approval workflow solution.
-    Enterprise version includes 4 additional solution patterns.
+    Hash a structured requirement (e.g. table specs) as canonical JSON, one
+    list item at a time so large models are never encoded as a single string.
     """
+    digest = hashlib.sha256()
+    for item in (value if isinstance(value, list) else [value]):
+        digest.update(json.dumps(item, sort_keys=True).encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
 
-    def generate(self, requirements: Dict) -> Dict:
-        """
-        Generate expense approval solution with full governance.
 
-        Enterprise version includes advanced error handling,
-        environment detection, and extended customization options.
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        solution_name = f"ExpenseApproval_{timestamp}"
-        solution_path = os.path.join("sample_output", solution_name)
+def artifact_fingerprint(artifact: str, requirements: Dict, compact: bool = False) -> str:
+    """
+    Hash of everything an artifact is built from: its name, GENERATOR_VERSION,
+    the requirement fields listed for it in ARTIFACT_INPUTS and, for JSON
+    artifacts, whether it is written compact.
+    """
+    inputs = {}
+    for field in ARTIFACT_INPUTS.get(artifact, tuple(requirements)):
+        value = requirements.get(field, '')
+        if field in OPTIONAL_REQUIREMENTS:
+            if value:
+                inputs[field] = _structured_digest(value)
+        else:
+            inputs[field] = str(value).strip()
+    material = [artifact, GENERATOR_VERSION, inputs]
+    if compact and artifact.endswith('.json'):
+        material.append('compact')
+    material = json.dumps(material, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
 
-        os.makedirs(solution_path, exist_ok=True)
 
-        print(f"\nGenerating enterprise-grade solution: {solution_name}")
-        print("Components:")
-        print("  ✓ Model-Driven App configuration")
-        print("  ✓ Dataverse table schemas")
-        print("  ✓ Power Automate approval flow")
-        print("  ✓ Security role definitions")
-        print("  ✓ Governance documentation")
-        print("  ✓ ALM deployment package")
-
-        # Generate app definition
-        app_def = self._generate_app_definition(requirements)
-        with open(os.path.join(solution_path, "app_definition.json"), 'w') as f:
-            import json
-            json.dump(app_def, f, indent=2)
-
-        # Generate governance documentation
-        governance = self._generate_governance(requirements)
-        with open(os.path.join(solution_path, "governance.md"), 'w') as f:
-            f.write(governance)
-
-        # Generate security roles
-        security = self._generate_security_roles()
-        with open(os.path.join(solution_path, "security_roles.json"), 'w') as f:
-            import json
-            json.dump(security, f, indent=2)
-
-        print(f"\n✓ Solution generated: {solution_path}")
-        print("\nEnterprise version includes:")
-        print("  • Advanced multi-level approval routing")
-        print("  • Integration with existing approval systems")
-        print("  • Custom approval policies and thresholds")
-        print("  • Automated cost center validation")
-        print("  • Executive dashboard and analytics")
+# Output modes, quietest first: library default, JSON event stream,
+# CLI summaries, and the full interactive demonstration text
+OUTPUT_MODES = ('silent', 'events', 'text', 'interactive')
 
-        return {
-            'name': solution_name,
-            'path': solution_path,
-            'type': 'expense_approval'
-        }
 
-    def _generate_app_definition(self, requirements: Dict) -> Dict:
-        """Generate Model-Driven App configuration"""
-        return {
-            "name": "Expense Approval System",
-            "uniqueName": "expense_approval",
-            "type": "ModelDriven",
-            "description": "Enterprise expense approval workflow with governance",
-            "tables": [
-                {
-                    "logicalName": "cr_expenserequest",
-                    "displayName": "Expense Request",
-                    "attributes": [
-                        {"name": "cr_amount", "type": "Money", "required": True},
-                        {"name": "cr_category", "type": "OptionSet", "required": True},
-                        {"name": "cr_justification", "type": "Memo", "required": True},
-                        {"name": "cr_status", "type": "OptionSet", "required": True},
-                        {"name": "cr_approver", "type": "Lookup", "target": "systemuser"}
-                    ]
-                }
-            ],
-            "flows": [
-                {
-                    "name": "Expense Approval Workflow",
-                    "type": "automated",
-                    "trigger": "Dataverse - When row is added or modified"
-                }
-            ],
-            "securityRoles": ["Expense Admin", "Expense Approver", "Expense Submitter"],
-            "note": "Enterprise version includes advanced routing, policy engines, and analytics"
-        }
+class Output:
+    """
+    User-facing output for the orchestrator.
 
-    def _generate_governance(self, requirements: Dict) -> str:
-        """
-        Generate comprehensive governance documentation.
+    say() is for CLI summaries and results, detail() for the banner and
+    progress text of the interactive demonstration, and event() writes one
+    JSON object per line for machine consumers. The default mode is silent, so
+    library callers pay nothing for console I/O.
+    """
+
+    def __init__(self, mode: str = 'silent', stream=None):
+        self.mode = mode
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: str):
+        if mode not in OUTPUT_MODES:
+            raise ValueError(f"output mode must be one of {OUTPUT_MODES}, not {mode!r}")
+        self._mode = mode
+        self.text = mode in ('text', 'interactive')
+        self.interactive = mode == 'interactive'
+        self.events = mode == 'events'
+
+    def _write(self, text: str):
+        stream = self.stream or sys.stdout
+        with self._lock:
+            stream.write(text)
+            stream.flush()
+
+    def say(self, text: str = ""):
+        if self.text:
+            self._write(text + "\n")
+
+    def detail(self, text: str = ""):
+        if self.interactive:
+            self._write(text + "\n")
+
+    def event(self, event: str, **fields):
+        if self.events:
+            record = {'event': event, 'time': time.time()}
+            record.update(fields)
+            self._write(json.dumps(record, default=str) + "\n")
+
+
+# Process-wide output used by the generators, orchestrator and CLI
+OUTPUT = Output()
+
+
+class _Span:
+    """Timing context for one named span; recorded into its Tracer on exit"""
+
+    __slots__ = ('spans', 'name', 'attrs', 'start')
+
+    def __init__(self, spans: List, name: str, attrs: Dict):
+        self.spans = spans
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = _clock_ns()
+        return self
 
-        Enterprise version includes expanded compliance frameworks,
-        industry-specific requirements, and audit trail configuration.
+    def __exit__(self, *exc_info):
+        start = self.start
+        self.spans.append((self.name, start, _clock_ns() - start, _thread_id(), self.attrs))
+        return False
+
+
+class _MemorySpan(_Span):
+    """
+    Span that also records tracemalloc usage into its attrs: alloc_bytes is
+    the peak traced memory above the span's start (what the stage held at
+    once), retained_bytes what it left allocated and traced_bytes the process
+    total afterwards. Memory held by the span records themselves is left out,
+    apart from attribute values the caller passed in (a solution name, say).
+    Open spans nest per thread, but tracemalloc counts the whole process, so
+    the figures are exact for serial generation and blur when solutions
+    overlap in threads.
+    """
+
+    __slots__ = ('frame', 'state')
+
+    def __enter__(self):
+        current, peak = _tracemalloc.get_traced_memory()
+        state = self.state = _memory_state
+        frames = state.frames
+        if frames:
+            # Fold the peak so far into the enclosing span before resetting it
+            frames[-1][1] = max(frames[-1][1], peak)
+        _tracemalloc.reset_peak()
+        self.frame = [current, current, state.record_bytes]
+        frames.append(self.frame)
+        self.start = _clock_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        start = self.start
+        duration = _clock_ns() - start
+        current, peak = _tracemalloc.get_traced_memory()
+        state, frame = self.state, self.frame
+        frames = state.frames
+        start_bytes, start_peak, start_records = frame
+        # Normally the innermost frame; frames compare equal by value, so find this one by identity
+        index = len(frames) - 1
+        while frames[index] is not frame:
+            index -= 1
+        del frames[index]
+        peak = max(peak, start_peak)
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        records = state.record_bytes
+        nested = records - start_records
+        attrs = dict(self.attrs, alloc_bytes=peak - start_bytes - nested,
+                     retained_bytes=current - start_bytes - nested, traced_bytes=current - records)
+        record = (self.name, start, duration, _thread_id(), attrs)
+        self.spans.append(record)
+        # The record owns its tuple, attrs dict and numbers (plus a list slot)
+        state.record_bytes = records + sum(map(sys.getsizeof, (record, attrs, start, duration, record[3],
+                                                            attrs['alloc_bytes'], attrs['retained_bytes'],
+                                                            attrs['traced_bytes']))) + 8
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_clock_ns = time.perf_counter_ns
+_thread_id = threading.get_ident
+_tracemalloc = None  # imported by Tracer.track_memory
+
+
+class _MemoryState(threading.local):
+    """Per-thread bookkeeping for _MemorySpan"""
+
+    def __init__(self):
+        self.frames = []  # [start_bytes, peak_bytes, record_bytes] of each open span, innermost last
+        self.record_bytes = 0  # traced bytes held by this thread's span records not yet drained
+
+
+_memory_state = _MemoryState()
+
+
+class Tracer:
+    """
+    Lightweight named-span recorder for the generation pipeline.
+
+    A span costs two clock reads and one list append when enabled and nothing
+    but a shared no-op context when disabled, so it can stay on in production.
+    Spans export as JSON lines or as a Chrome trace (chrome://tracing, Perfetto).
+    With track_memory() each span also records its tracemalloc allocations.
+    Runs that finish keep every span; long-lived processes bound the buffer
+    with keep_last(), so it holds only the most recent spans.
+    """
+
+    def __init__(self, enabled: bool = False, limit: Optional[int] = None):
+        self.enabled = enabled
+        self.memory = False
+        self.limit = limit
+        # (name, start_ns, duration_ns, thread, attrs) from this process
+        self.spans = [] if limit is None else deque(maxlen=limit)
+        self._imported = []  # (pid, spans) handed back by worker processes
+
+    def keep_last(self, limit: Optional[int]):
+        """Keep only the most recent limit spans from now on (all of them with None)"""
+        self.limit = limit
+        self.spans = list(self.spans) if limit is None else deque(self.spans, maxlen=limit)
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        if self.memory:
+            return _MemorySpan(self.spans, name, attrs)
+        return _Span(self.spans, name, attrs)
+
+    def track_memory(self, frames: int = 1):
         """
-        return f"""# Governance Documentation: Expense Approval System
+        Record tracemalloc allocations in every span from now on (starting
+        tracemalloc if needed). Tracing memory slows generation several-fold.
+        """
+        global _tracemalloc
+        import tracemalloc
+
+        if not hasattr(tracemalloc, 'reset_peak'):
+            raise RuntimeError("memory accounting needs Python 3.9 or later")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        _tracemalloc = tracemalloc
+        self.enabled = self.memory = True
+
+    def drain(self) -> List:
+        """Remove and return the spans recorded in this process so far"""
+        spans = list(self.spans)
+        self.spans = [] if self.limit is None else deque(maxlen=self.limit)
+        _memory_state.record_bytes = 0  # handed off, and released once the caller is done
+        return spans
+
+    def extend(self, spans: List, pid: int):
+        """Merge spans drained from another process"""
+        if spans:
+            self._imported.append((pid, [tuple(span) for span in spans]))
+
+    def records(self) -> Iterator[tuple]:
+        """Every span as (name, start_ns, duration_ns, pid, thread, attrs)"""
+        pid = os.getpid()
+        for name, start, duration, thread, attrs in self.spans:
+            yield name, start, duration, pid, thread, attrs
+        for pid, spans in self._imported:
+            for name, start, duration, thread, attrs in spans:
+                yield name, start, duration, pid, thread, attrs
+
+    def summary(self) -> Dict[str, Dict]:
+        totals = {}
+        for name, _, duration, _, _, attrs in self.records():
+            entry = totals.setdefault(name, {'count': 0, 'total_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += duration / 1e6
+            if 'alloc_bytes' in attrs:
+                entry['alloc_bytes'] = entry.get('alloc_bytes', 0) + attrs['alloc_bytes']
+                entry['retained_bytes'] = entry.get('retained_bytes', 0) + attrs['retained_bytes']
+        for entry in totals.values():
+            entry['mean_ms'] = entry['total_ms'] / entry['count']
+            if 'alloc_bytes' in entry:
+                entry['mean_alloc_kb'] = entry['alloc_bytes'] / entry['count'] / 1024
+                entry['mean_retained_kb'] = entry['retained_bytes'] / entry['count'] / 1024
+        return totals
+
+    def export(self, path: str):
+        """Write spans as a Chrome trace (.json) or JSON lines (any other extension)"""
+        with open(path, 'w') as f:
+            if path.lower().endswith('.json'):
+                events = [
+                    {
+                        'name': name, 'ph': 'X', 'ts': start / 1000, 'dur': duration / 1000,
+                        'pid': pid, 'tid': thread, 'args': attrs,
+                    }
+                    for name, start, duration, pid, thread, attrs in self.records()
+                ]
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+            else:
+                for name, start, duration, pid, thread, attrs in self.records():
+                    f.write(json.dumps({
+                        'name': name, 'start_ns': start, 'duration_ns': duration,
+                        'pid': pid, 'thread': thread, 'attrs': attrs,
+                    }) + "\n")
+
+
+# Process-wide tracer used by the generators, writers and orchestrator
+TRACER = Tracer()
+
+# Traced memory a long-running generator may gain per solution once its
+# caches are warm before memory_report flags it as growing. Span records keep
+# up to ~200 bytes per solution alive themselves (solution names among them);
+# benchmarks/bench_memory.py measures without them and gates much tighter.
+MEMORY_GROWTH_LIMIT = 256
+
+
+def memory_growth(traced: List[int], warmup: float = 0.5) -> float:
+    """
+    Bytes gained per solution: the least-squares slope of the traced memory
+    total after each solution, skipping the first warmup share of the run
+    while caches fill.
+    """
+    samples = traced[int(len(traced) * warmup):]
+    count = len(samples)
+    if count < 2:
+        return 0.0
+    mean_x = (count - 1) / 2
+    mean_y = sum(samples) / count
+    spread = sum((x - mean_x) ** 2 for x in range(count))
+    return sum((x - mean_x) * (y - mean_y) for x, y in enumerate(samples)) / spread
+
+
+def memory_report(tracer: Tracer = TRACER, warmup: float = 0.5) -> Dict:
+    """
+    Allocation figures from a memory-tracked run: per-stage means, the
+    per-solution peak and retained bytes of each 'generate' span, and the
+    steady-state growth per solution for each process (the largest wins).
+    growing is set when that exceeds MEMORY_GROWTH_LIMIT.
+    """
+    stages = {name: {'count': entry['count'], 'mean_alloc_kb': entry['mean_alloc_kb'],
+                     'mean_retained_kb': entry['mean_retained_kb']}
+              for name, entry in tracer.summary().items() if 'mean_alloc_kb' in entry}
+    traced = {}
+    alloc = []
+    retained = []
+    for name, _, _, pid, _, attrs in tracer.records():
+        if name == 'generate' and 'alloc_bytes' in attrs:
+            traced.setdefault(pid, []).append(attrs['traced_bytes'])
+            alloc.append(attrs['alloc_bytes'])
+            retained.append(attrs['retained_bytes'])
+    growth = max((memory_growth(series, warmup) for series in traced.values()), default=0.0)
+    return {
+        'stages': stages,
+        'solutions': len(alloc),
+        'alloc_per_solution_kb': sorted(alloc)[len(alloc) // 2] / 1024 if alloc else 0.0,
+        'retained_per_solution_bytes': sum(retained) / len(retained) if retained else 0.0,
+        'growth_per_solution_bytes': growth,
+        'growing': growth > MEMORY_GROWTH_LIMIT,
+    }
+
+
+def print_memory_report(report: Dict):
+    """Show a memory_report as a table, or as one 'memory_report' event"""
+    OUTPUT.event('memory_report', **report)
+    OUTPUT.say(f"\n{'stage':<22}{'spans':>8}{'alloc KB':>11}{'retained KB':>13}")
+    for name, entry in sorted(report['stages'].items(), key=lambda item: -item[1]['mean_alloc_kb']):
+        OUTPUT.say(f"{name:<22}{entry['count']:>8}{entry['mean_alloc_kb']:>11.1f}"
+                   f"{entry['mean_retained_kb']:>13.2f}")
+    if report['solutions']:
+        OUTPUT.say(f"\nPer solution: {report['alloc_per_solution_kb']:.1f} KB allocated at peak (median), "
+                   f"{report['retained_per_solution_bytes']:.0f} bytes retained (mean) over "
+                   f"{report['solutions']:,} solutions")
+        OUTPUT.say(f"Steady-state growth: {report['growth_per_solution_bytes']:.0f} bytes per solution")
+        if report['growing']:
+            OUTPUT.say(f"⚠ Memory keeps growing across generations "
+                       f"(limit {MEMORY_GROWTH_LIMIT} bytes per solution)")
+
+
+def profile_run(func: Callable, mode: str = 'cprofile', output_path: Optional[str] = None,
+                top: int = 20):
+    """
+    Run func once under cProfile or tracemalloc and report the hottest
+    entries through OUTPUT (text, or one 'profile' event).
+
+    'memory' mode tracks allocations per pipeline stage instead (see
+    memory_report) and flags growth across the solutions generated.
+    output_path receives the raw pstats dump or tracemalloc snapshot for
+    later inspection. Returns whatever func returns.
+    """
+    if mode == 'cprofile':
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func)
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text).sort_stats('cumulative')
+        stats.print_stats(top)
+        OUTPUT.say(text.getvalue().rstrip())
+        if OUTPUT.events:
+            entries = []
+            for function in stats.fcn_list[:top]:
+                _, calls, own, cumulative, _ = stats.stats[function]
+                entries.append({'function': pstats.func_std_string(function), 'calls': calls,
+                                'tottime': own, 'cumtime': cumulative})
+            OUTPUT.event('profile', mode=mode, entries=entries)
+        if output_path:
+            profiler.dump_stats(output_path)
+    elif mode == 'tracemalloc':
+        import tracemalloc
+
+        tracemalloc.start(25)
+        try:
+            result = func()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        sites = snapshot.statistics('lineno')[:top]
+        OUTPUT.say(f"\nTop {top} allocation sites:")
+        for stat in sites:
+            OUTPUT.say(f"  {stat}")
+        OUTPUT.event('profile', mode=mode, entries=[
+            {'site': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count} for stat in sites])
+        if output_path:
+            snapshot.dump(output_path)
+    elif mode == 'memory':
+        import tracemalloc
+
+        tracing, memory = TRACER.enabled, TRACER.memory
+        started = not tracemalloc.is_tracing()
+        TRACER.track_memory()
+        try:
+            result = func()
+            snapshot = tracemalloc.take_snapshot() if output_path else None
+        finally:
+            if started:
+                tracemalloc.stop()
+            TRACER.enabled, TRACER.memory = tracing, memory
+        print_memory_report(memory_report())
+        if output_path:
+            snapshot.dump(output_path)
+    else:
+        raise ValueError(f"unknown profile mode: {mode!r}")
+    return result
+
+
+class DocumentTemplate:
+    """
+    Text document parsed once into static segments and typed slots.
+
+    Slots are written as {{generated}}, {{version_date}},
+    {{requirement:<field>}} or {{section:<name>}}, where sections are
+    functions of the requirements passed in by name. Rendering fills the slots
+    into a copy of the pre-split segment list and joins it, so the static
+    text is never rebuilt. All timestamp slots in one render share a single
+    clock reading.
+    """
+
+    SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)(?::(\w+))?\s*\}\}")
+    TIMESTAMP_FORMATS = {
+        'generated': '%Y-%m-%d %H:%M:%S',
+        'version_date': '%Y-%m-%d',
+    }
 
-**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    def __init__(self, text: str, sections: Optional[Dict[str, Callable[[Dict], str]]] = None):
+        self._sections = dict(sections or {})
+        self._parts = []
+        self._slots = []  # (index into _parts, kind, argument)
+        position = 0
+        for match in self.SLOT_PATTERN.finditer(text):
+            kind, argument = match.group(1), match.group(2)
+            if kind == 'requirement':
+                if not argument:
+                    raise ValueError(f"requirement slot needs a field name: {match.group(0)}")
+            elif kind == 'section':
+                if argument not in self._sections:
+                    raise ValueError(f"no renderer for template section: {match.group(0)}")
+            elif kind not in self.TIMESTAMP_FORMATS or argument:
+                raise ValueError(f"unknown template slot: {match.group(0)}")
+
+            self._parts.append(text[position:match.start()])
+            self._slots.append((len(self._parts), kind, argument))
+            self._parts.append(None)
+            position = match.end()
+        self._parts.append(text[position:])
+
+        self._clock = (None, {})
+
+    def _timestamps(self, now: datetime) -> Dict[str, str]:
+        # Formatted stamps only change once a second; reuse them within it
+        key = now.replace(microsecond=0)
+        cached_key, values = self._clock
+        if key != cached_key:
+            values = {kind: now.strftime(fmt) for kind, fmt in self.TIMESTAMP_FORMATS.items()}
+            self._clock = (key, values)
+        return values
+
+    def render(self, requirements: Dict, now: Optional[datetime] = None) -> str:
+        """Fill the slots from requirements and a single timestamp"""
+        stamps = self._timestamps(now or datetime.now())
+        parts = self._parts[:]
+        for index, kind, argument in self._slots:
+            if kind == 'requirement':
+                parts[index] = str(requirements.get(argument, ''))
+            elif kind == 'section':
+                parts[index] = self._sections[argument](requirements)
+            else:
+                parts[index] = stamps[kind]
+        return ''.join(parts)
+
+
+GOVERNANCE_TEMPLATE = """# Governance Documentation: Expense Approval System
+
+**Generated**: {{generated}}
 **Classification**: Enterprise Business Application
 
 ## Executive Summary
@@ -126,6 +576,12 @@ This document provides IT governance information for deploying and managing the
 Expense Approval System in accordance with enterprise security, compliance, and
 operational standards.
 
+### Business Context
+- **Business Problem**: {{requirement:business_problem}}
+- **Current Pain Point**: {{requirement:pain_point}}
+- **Approval Levels**: {{requirement:approval_levels}}
+- **Compliance Requirements**: {{requirement:compliance}}
+
 ## Security Framework
 
 ### Access Control
@@ -173,9 +629,7 @@ operational standards.
 - **Power Automate**: Per-user for approval workflows
 
 ### Cost Projections
-- Base deployment: $20/user/month (approvers and admins)
-- Submitter-only users: $5/user/app/month option available
-- Estimated total: [Calculate based on user counts]
+{{section:cost_projections}}
 
 ### Optional Enhancements
 - Power BI Premium: Executive dashboards ($20/user/month)
@@ -284,7 +738,7 @@ This demonstration includes foundational governance framework.
 
 | Version | Date | Changes | Approver |
 |---------|------|---------|----------|
-| 1.0.0   | {datetime.now().strftime('%Y-%m-%d')} | Initial deployment | [Pending] |
+| 1.0.0   | {{version_date}} | Initial deployment | [Pending] |
 
 ## Additional Resources
 
@@ -301,218 +755,3790 @@ This demonstration includes foundational governance framework.
 *Generated by Power Platform Solutions Orchestrator - Enterprise Edition*
 """
 
-    def _generate_security_roles(self) -> Dict:
-        """Generate security role definitions"""
-        return {
-            "roles": [
-                {
-                    "name": "Expense Admin",
-                    "description": "Full administrative access to expense system",
-                    "privileges": {
-                        "cr_expenserequest": {
-                            "create": "Organization",
-                            "read": "Organization",
-                            "write": "Organization",
-                            "delete": "Organization",
-                            "assign": "Organization",
-                            "share": "Organization"
-                        }
-                    },
-                    "auditEnabled": True
-                },
-                {
-                    "name": "Expense Approver",
-                    "description": "Can approve expense requests within scope",
-                    "privileges": {
-                        "cr_expenserequest": {
-                            "create": "None",
-                            "read": "BusinessUnit",
-                            "write": "BusinessUnit",
-                            "delete": "None",
-                            "assign": "BusinessUnit",
-                            "share": "None"
-                        }
-                    },
-                    "auditEnabled": True,
-                    "mfaRequired": True
-                },
-                {
-                    "name": "Expense Submitter",
-                    "description": "Can submit and track own expense requests",
-                    "privileges": {
-                        "cr_expenserequest": {
-                            "create": "User",
-                            "read": "User",
-                            "write": "User",
-                            "delete": "User",
-                            "assign": "None",
-                            "share": "None"
-                        }
-                    },
-                    "auditEnabled": True
-                }
-            ],
-            "note": "Enterprise version includes advanced role hierarchies and dynamic security groups"
-        }
+# License list prices in USD per user per month, as quoted under Licensing
+# Requirements in the governance document
+LICENSE_PRICES = {
+    'per_user': 20.0,          # Power Apps per user (Dataverse included)
+    'per_app': 5.0,            # Power Apps per user, per app
+    'power_bi_premium': 20.0,  # Power BI Premium per user
+}
 
+# Roles counted in the 'users' requirement field
+COST_ROLES = ('admin', 'approver', 'submitter')
 
-class PowerPlatformOrchestrator:
+# Largest user count per role accepted; grown 500% it still fits NumPy's int64
+MAX_USERS = 10 ** 9
+
+# What-if grid projected for every governance document: 50% to 500% of the
+# stated users, Power BI Premium for 0-100% of admins and approvers, and
+# either license for submitters (3,822 scenarios)
+COST_GROWTH = tuple(round(0.5 + 0.05 * step, 2) for step in range(91))
+COST_BI_ADOPTION = tuple(step / 20 for step in range(21))
+SUBMITTER_PLANS = ('per_app', 'per_user')
+
+# Growth rows shown in the document's what-if table
+COST_TABLE_GROWTH = (1.0, 1.5, 2.0, 3.0)
+
+# Amount layout per locale: (currency symbol, digit grouping, decimal mark,
+# symbol before the amount). Prices stay in USD. Python's locale module is
+# process-wide, which generator threads cannot share, hence a table.
+CURRENCY_FORMATS = {
+    'en_US': ('$', ',', '.', True),
+    'en_GB': ('US$', ',', '.', True),
+    'en_CA': ('US$', ',', '.', True),
+    'de_DE': ('$', '.', ',', False),
+    'fr_FR': ('$', ' ', ',', False),
+    'es_ES': ('US$', '.', ',', False),
+    'ja_JP': ('US$', ',', '.', True),
+}
+DEFAULT_LOCALE = 'en_US'
+
+
+def format_number(value: float, locale: str = DEFAULT_LOCALE, decimals: int = 0) -> str:
+    _, grouping, decimal, _ = CURRENCY_FORMATS[locale]
+    text = f"{value:,.{decimals}f}"
+    return text.replace(',', '\0').replace('.', decimal).replace('\0', grouping)
+
+
+def format_currency(amount: float, locale: str = DEFAULT_LOCALE) -> str:
+    symbol, _, _, before = CURRENCY_FORMATS[locale]
+    digits = format_number(amount, locale, 2)
+    return f"{symbol}{digits}" if before else f"{digits} {symbol}"
+
+
+def project_costs(admins, approvers, submitters, submitter_prices, bi_users,
+                  prices: Dict[str, float] = LICENSE_PRICES):
     """
-    Enterprise Power Platform Solutions Orchestrator
+    Monthly license cost of many scenarios in one pass. Each argument holds
+    one value per scenario (sequences or NumPy arrays); with NumPy installed
+    the arithmetic is vectorized and an array is returned, otherwise a list.
+    """
+    per_user, bi_price = prices['per_user'], prices['power_bi_premium']
+    np = _numpy()
+    if np is not None:
+        return ((np.asarray(admins) + np.asarray(approvers)) * per_user
+                + np.asarray(submitters) * np.asarray(submitter_prices)
+                + np.asarray(bi_users) * bi_price)
+    return [(admin + approver) * per_user + submitter * price + bi * bi_price
+            for admin, approver, submitter, price, bi
+            in zip(admins, approvers, submitters, submitter_prices, bi_users)]
 
-    Demonstration version includes expense approval pattern.
-    Enterprise version includes 5+ solution patterns with advanced features.
+
+def licenses_needed(users, percent):
     """
+    Whole licenses for users scaled by percent (ints or NumPy integer arrays),
+    rounded up in integer arithmetic: 50 users at 110% need 55, where
+    math.ceil(50 * 1.1) would give 56.
+    """
+    return -(-users * percent // 100)
 
-    # Pattern registry - Enterprise version includes full implementations
-    AVAILABLE_PATTERNS = {
-        'expense_approval': ExpenseApprovalGenerator(),
-        'asset_tracking': 'Enterprise version feature',
-        'data_collection': 'Enterprise version feature',
-        'external_integration': 'Enterprise version feature',
-        'analytics_dashboards': 'Enterprise version feature'
+
+def cost_scenarios(admins: int, approvers: int, submitters: int,
+                   growth: Iterable[float] = COST_GROWTH, adoption: Iterable[float] = COST_BI_ADOPTION,
+                   plans: Iterable[str] = SUBMITTER_PLANS,
+                   prices: Dict[str, float] = LICENSE_PRICES) -> Dict:
+    """
+    Project every combination of user growth, Power BI Premium adoption
+    (share of admins and approvers) and submitter plan. Factors are taken to
+    the nearest percent and licenses are whole, so scaled user counts round
+    up (see licenses_needed). Returns parallel columns: growth, adoption,
+    plan and monthly cost, one entry per scenario.
+    """
+    growth, adoption, plans = list(growth), list(adoption), list(plans)
+    plan_prices = [prices[plan] for plan in plans]
+    np = _numpy()
+    if np is not None:
+        g = np.repeat(np.asarray(growth, dtype=float), len(adoption) * len(plans))
+        a = np.tile(np.repeat(np.asarray(adoption, dtype=float), len(plans)), len(growth))
+        p = np.tile(np.arange(len(plans)), len(growth) * len(adoption))
+        g_pct, a_pct = np.rint(g * 100).astype(np.int64), np.rint(a * 100).astype(np.int64)
+        scaled = [licenses_needed(count, g_pct) for count in (admins, approvers, submitters)]
+        monthly = project_costs(*scaled, np.asarray(plan_prices)[p],
+                                licenses_needed(scaled[0] + scaled[1], a_pct), prices)
+        return {'growth': g, 'adoption': a, 'plan': [plans[i] for i in p.tolist()], 'monthly': monthly}
+
+    columns = {'growth': [], 'adoption': [], 'plan': []}
+    scaled = []
+    for factor in growth:
+        g_pct = round(factor * 100)
+        users = tuple(licenses_needed(count, g_pct) for count in (admins, approvers, submitters))
+        for share in adoption:
+            bi = licenses_needed(users[0] + users[1], round(share * 100))
+            for plan, price in zip(plans, plan_prices):
+                columns['growth'].append(factor)
+                columns['adoption'].append(share)
+                columns['plan'].append(plan)
+                scaled.append(users + (price, bi))
+    columns['monthly'] = project_costs(*zip(*scaled), prices=prices) if scaled else []
+    return columns
+
+
+@functools.lru_cache(maxsize=1024)
+def cost_projection(admins: int, approvers: int, submitters: int) -> Dict:
+    """
+    Headline plans, the what-if table and the range over the full scenario
+    grid for one set of user counts. Memoized by the counts; the result is
+    shared between callers and must not be modified.
+    """
+    staff = admins + approvers
+    plans = {
+        'per_user': project_costs([admins], [approvers], [submitters], [LICENSE_PRICES['per_user']], [0]),
+        'per_app': project_costs([admins], [approvers], [submitters], [LICENSE_PRICES['per_app']], [0]),
+        'per_app_bi': project_costs([admins], [approvers], [submitters], [LICENSE_PRICES['per_app']],
+                                    [staff]),
+    }
+    table = cost_scenarios(admins, approvers, submitters, COST_TABLE_GROWTH, (0.0, 1.0))
+    grid = cost_scenarios(admins, approvers, submitters)
+    monthly = grid['monthly']
+    return {
+        'plans': {name: float(cost[0]) for name, cost in plans.items()},
+        'table': [(float(factor), float(cost)) for factor, cost in zip(table['growth'], table['monthly'])],
+        'scenarios': len(monthly),
+        'minimum': float(min(monthly)),
+        'maximum': float(max(monthly)),
     }
 
-    def __init__(self):
-        self.conversation_history = []
 
-    def start_conversation(self):
+@functools.lru_cache(maxsize=1024)
+def _cost_section(admins: int, approvers: int, submitters: int, locale: str) -> str:
+    projection = cost_projection(admins, approvers, submitters)
+    money = functools.partial(format_currency, locale=locale)
+    count = functools.partial(format_number, locale=locale)
+    plans = projection['plans']
+    total = admins + approvers + submitters
+
+    lines = [
+        f"Based on {count(admins)} admins, {count(approvers)} approvers and {count(submitters)} "
+        f"submitters ({count(total)} users):",
+        "",
+        "| Licensing plan | Monthly | Annual |",
+        "|----------------|--------:|-------:|",
+    ]
+    for name, label in (('per_user', "Per-user licenses for all users"),
+                        ('per_app', "Per-app licenses for submitters"),
+                        ('per_app_bi', "Per-app for submitters + Power BI Premium for admins and approvers")):
+        lines.append(f"| {label} | {money(plans[name])} | {money(plans[name] * 12)} |")
+    lines += [
+        "",
+        f"- Base deployment: {money(LICENSE_PRICES['per_user'])}/user/month (approvers and admins)",
+        f"- Submitter-only users: {money(LICENSE_PRICES['per_app'])}/user/app/month option available",
+        f"- Estimated total: {money(plans['per_app'])}/month ({money(plans['per_app'] * 12)}/year) "
+        f"with per-app licenses for submitters",
+        "",
+        "#### What-if Scenarios",
+        "| Users | Per-app submitters | + Power BI Premium | Per-user for all users |",
+        "|------:|-------------------:|-------------------:|-----------------------:|",
+    ]
+    # Table columns come in (growth, adoption, plan) order: no BI/per_app,
+    # no BI/per_user, full BI/per_app, full BI/per_user
+    table = projection['table']
+    for row in range(len(COST_TABLE_GROWTH)):
+        factor, per_app = table[row * 4]
+        per_user, bi = table[row * 4 + 1][1], table[row * 4 + 2][1]
+        users = sum(licenses_needed(n, round(factor * 100)) for n in (admins, approvers, submitters))
+        lines.append(f"| {factor:.0%} ({count(users)}) | {money(per_app)} | {money(bi)} | {money(per_user)} |")
+    lines += [
+        "",
+        f"Across {count(projection['scenarios'])} scenarios ({COST_GROWTH[0]:.0%} to {COST_GROWTH[-1]:.0%} "
+        f"of these users, Power BI Premium for 0-100% of admins and approvers, either submitter "
+        f"plan), monthly cost ranges from {money(projection['minimum'])} to {money(projection['maximum'])}.",
+    ]
+    return "\n".join(lines)
+
+
+def render_cost_projections(requirements: Dict) -> str:
+    """Cost Projections section body; the list prices alone without user counts"""
+    users = requirements.get('users')
+    if not users:
+        return ("- Base deployment: $20/user/month (approvers and admins)\n"
+                "- Submitter-only users: $5/user/app/month option available\n"
+                "- Estimated total: [Calculate based on user counts]")
+    return _cost_section(*(int(users.get(role, 0)) for role in COST_ROLES),
+                         requirements.get('locale') or DEFAULT_LOCALE)
+
+
+def clear_cost_projections():
+    """Forget the memoized projections and rendered sections"""
+    cost_projection.cache_clear()
+    _cost_section.cache_clear()
+
+
+GOVERNANCE_DOCUMENT = DocumentTemplate(GOVERNANCE_TEMPLATE, {'cost_projections': render_cost_projections})
+
+
+# fsync policies understood by ArtifactWriter, weakest first
+DURABILITY_LEVELS = ('none', 'batch', 'solution')
+
+# Committed paths a 'batch' writer holds before syncing them as a group, so
+# long batches keep a bounded list rather than every path until the end
+BATCH_SYNC_PATHS = 4096
+
+
+def _fsync_path(path: str):
+    # Directories cannot be opened for fsync on Windows; renames there are
+    # already journaled by NTFS
+    if os.name == 'nt' and os.path.isdir(path):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ArtifactWriter:
+    """
+    Atomic writer for solution files.
+
+    Callers serialize each file fully in memory and stage() it; the bytes go to
+    a temporary file beside the destination in a single write. commit() renames
+    every staged file into place, so an interrupted run never leaves a partial
+    artifact behind. Durability controls fsync:
+
+      none      no fsync (safe against killed processes, not power loss)
+      batch     fsyncs are deferred and issued together by flush() (or
+                in groups of BATCH_SYNC_PATHS during long runs)
+      solution  staged files are fsynced before the rename and each
+                directory once per commit
+
+    Staged files are tracked per thread, so one writer can be shared by a
+    thread pool. Work spread over several threads (as in generate_async) uses
+    prepare() and passes the resulting list to commit()/abort() explicitly.
+    """
+
+    def __init__(self, durability: str = 'solution'):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {DURABILITY_LEVELS}, not {durability!r}")
+        self.durability = durability
+        self._local = threading.local()
+        self._unsynced = []
+        self._lock = threading.Lock()
+
+    def _staged(self) -> List:
+        staged = getattr(self._local, 'staged', None)
+        if staged is None:
+            staged = self._local.staged = []
+        return staged
+
+    def stage(self, destination: str, data: Union[bytes, Iterable[bytes]],
+              link_from: Optional[str] = None):
         """
-        Conversational requirements gathering using iterative questioning.
+        Stage a file for the next commit. data is bytes or an iterable of byte
+        chunks, written as they are produced. With link_from, the temporary
+        file is a hard link to that path instead of a copy of data (data is
+        the fallback when linking is not possible).
+        """
+        self._staged().append(self.prepare(destination, data, link_from))
 
-        Based on design thinking methodologies for understanding business problems
-        before technical solutions. Enterprise version includes adaptive pattern
-        recognition and intelligent routing.
+    def prepare(self, destination: str, data: Union[bytes, Iterable[bytes]],
+                link_from: Optional[str] = None) -> Tuple[str, str]:
         """
-        print("\n" + "="*70)
-        print("  Power Platform Solutions Orchestrator - Enterprise Edition")
-        print("="*70)
-        print("\nWelcome. I'll help design an enterprise Power Platform solution.")
-        print("\nThis demonstration focuses on expense approval workflows.")
-        print("Enterprise version includes asset tracking, data collection,")
-        print("external integration, and analytics dashboard patterns.\n")
+        Write the temporary file for destination without staging it on this
+        thread; returns the (temp_path, destination) pair for commit(staged=...).
+        """
+        directory, name = os.path.split(destination)
+        temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
 
-        # Conversational requirements gathering
-        requirements = self._gather_requirements()
+        linked = False
+        if link_from:
+            try:
+                os.link(link_from, temp_path)
+                linked = True
+            except OSError:
+                pass
 
-        # Generate solution
-        if requirements:
-            return self._generate_solution(requirements)
+        if linked:
+            if self.durability == 'solution':
+                _fsync_path(temp_path)
+        else:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+            fd = os.open(temp_path, flags, 0o666)
+            try:
+                for chunk in ((data,) if isinstance(data, bytes) else data):
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view):]
+                if self.durability == 'solution':
+                    os.fsync(fd)
+            except BaseException:
+                os.close(fd)
+                os.remove(temp_path)
+                raise
+            os.close(fd)
 
-        return None
+        return temp_path, destination
 
-    def _gather_requirements(self) -> Dict:
-        """
-        Iterative questioning to understand business problem.
+    def commit(self, staged: Optional[List] = None) -> List[str]:
+        """Rename every file staged by this thread (or the given prepared files) into place"""
+        if staged is None:
+            staged = self._staged()
+            self._local.staged = []
 
-        Enterprise version includes intelligent pattern detection,
-        adaptive questioning, and integration discovery.
+        directories = []
+        try:
+            for temp_path, destination in staged:
+                os.replace(temp_path, destination)
+                directory = os.path.dirname(destination) or os.curdir
+                if directory not in directories:
+                    directories.append(directory)
+        except BaseException:
+            self._discard(staged)
+            raise
+
+        committed = [destination for _, destination in staged]
+        if self.durability == 'solution':
+            for directory in directories:
+                _fsync_path(directory)
+        elif self.durability == 'batch':
+            with self._lock:
+                self._unsynced.extend(committed)
+                self._unsynced.extend(directories)
+                full = len(self._unsynced) >= BATCH_SYNC_PATHS
+            if full:
+                self.flush()
+        return committed
+
+    def abort(self, staged: Optional[List] = None):
+        """Drop everything staged by this thread since the last commit (or the given files)"""
+        if staged is None:
+            staged = self._staged()
+            self._local.staged = []
+        self._discard(staged)
+
+    def flush(self, paths: Optional[List[str]] = None) -> int:
         """
-        requirements = {}
+        Issue the deferred fsyncs of a 'batch' writer, or fsync the given
+        files (and their directories), e.g. ones committed by pool workers.
+        Returns the number of paths synced.
+        """
+        if paths is None:
+            with self._lock:
+                paths, self._unsynced = self._unsynced, []
+        else:
+            directories = []
+            for path in paths:
+                directory = os.path.dirname(path) or os.curdir
+                if directory not in directories:
+                    directories.append(directory)
+            paths = list(paths) + directories
 
-        # Question 1: Business problem
-        print("Let's understand your business need.\n")
-        print("Question 1: What business problem are you solving?")
-        print("(For this demo, describe an expense approval challenge)\n")
+        for path in paths:
+            try:
+                _fsync_path(path)
+            except FileNotFoundError:
+                continue
+        return len(paths)
 
-        problem = input("Your answer: ").strip()
-        if not problem:
-            print("\nDemo cancelled. Enterprise version includes guided prompts.")
+    @staticmethod
+    def _discard(staged: List):
+        for temp_path, _ in staged:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+
+
+class ArtifactCache:
+    """
+    Content-addressed cache of serialized solution artifacts.
+
+    Entries are keyed by artifact_fingerprint, so requests that differ only in
+    fields an artifact does not use share its entry. A bounded in-memory
+    LRU sits in front of an optional on-disk tier whose total size is capped;
+    the least recently used files are evicted first. Solutions get their own
+    copy of each artifact. With link, disk entries are hard-linked into
+    solutions instead, which saves space but means a solution file edited in
+    place changes the cached entry and every solution sharing it.
+    """
+
+    def __init__(self, memory_items: int = 256, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 64 * 1024 * 1024, link: bool = False):
+        self.memory_items = memory_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.link = link
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer = ArtifactWriter('none')
+        self.counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0,
+        }
+
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            for entry_path in self._disk_entries():
+                self._disk_bytes += os.path.getsize(entry_path)
+
+    def key(self, artifact: str, requirements: Dict) -> str:
+        return artifact_fingerprint(artifact, requirements)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return data
+
+        entry_path = self._disk_path(key)
+        if entry_path:
+            try:
+                with open(entry_path, 'rb') as f:
+                    data = f.read()
+                os.utime(entry_path)
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.counters['disk_hits'] += 1
+                self._remember(key, data)
+                return data
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+
+        entry_path = self._disk_path(key)
+        if entry_path and not os.path.exists(entry_path):
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            self._writer.stage(entry_path, data)
+            self._writer.commit()
+            with self._lock:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def entry_path(self, key: str) -> Optional[str]:
+        """On-disk file to hard-link a cached entry from, when linking is enabled"""
+        if not self.link:
             return None
+        entry_path = self._disk_path(key)
+        if entry_path and os.path.exists(entry_path):
+            return entry_path
+        return None
 
-        requirements['business_problem'] = problem
-        self.conversation_history.append(('problem', problem))
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_items'] = len(self._memory)
+        stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (lookups - stats['misses']) / lookups if lookups else 0.0
+        return stats
 
-        # Question 2: Current process pain points
-        print("\nQuestion 2: What's the most frustrating part of your current process?")
-        print("(e.g., delays in approvals, lack of visibility, manual tracking)\n")
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+                self.counters['memory_evictions'] += 1
 
-        pain_point = input("Your answer: ").strip()
-        if not pain_point:
-            pain_point = "Manual approval tracking"
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, key[:2], key)
 
-        requirements['pain_point'] = pain_point
-        self.conversation_history.append(('pain_point', pain_point))
+    def _disk_entries(self) -> Iterator[str]:
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith('.tmp'):
+                    yield os.path.join(root, name)
 
-        # Question 3: Approval levels
-        print("\nQuestion 3: How many approval levels do you need?")
-        print("(e.g., 1 for manager only, 2 for manager + director, etc.)\n")
+    def _evict_disk(self):
+        # Other processes may share the directory, so re-measure before evicting
+        entries = []
+        for entry_path in self._disk_entries():
+            try:
+                info = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((info.st_mtime, info.st_size, entry_path))
+        entries.sort()
 
-        levels = input("Your answer: ").strip()
-        if not levels:
-            levels = "2"
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.counters['disk_evictions'] += 1
+        with self._lock:
+            self._disk_bytes = total
 
-        requirements['approval_levels'] = levels
-        self.conversation_history.append(('approval_levels', levels))
 
-        # Question 4: Key requirements
-        print("\nQuestion 4: Any specific compliance or policy requirements?")
-        print("(e.g., SOX compliance, spending limits, cost center tracking)\n")
-
-        compliance = input("Your answer (or press Enter to skip): ").strip()
-        requirements['compliance'] = compliance if compliance else "Standard corporate policy"
-
-        print("\n" + "="*70)
-        print("  Requirements Gathered")
-        print("="*70)
-        print(f"\nBusiness Problem: {requirements['business_problem']}")
-        print(f"Pain Point: {requirements['pain_point']}")
-        print(f"Approval Levels: {requirements['approval_levels']}")
-        print(f"Compliance: {requirements['compliance']}")
-
-        print("\nEnterprise version includes:")
-        print("  • Intelligent pattern detection across all business domains")
-        print("  • Adaptive questioning based on industry and context")
-        print("  • Integration discovery and feasibility analysis")
-        print("  • Stakeholder mapping and change impact assessment")
+class SolutionPack:
+    """
+    Append-only file holding many solutions, with random-access reads.
 
-        return requirements
+    Artifact bytes are appended to the pack file; a sidecar index (<pack>.idx,
+    one JSON line per solution) records each artifact's offset and length.
+    An index line is written only after its data, so a torn tail from a killed
+    run is simply ignored. Reads slice a read-only memory map of the pack, so a
+    single artifact is served without unpacking anything else.
 
-    def _generate_solution(self, requirements: Dict) -> Dict:
-        """
-        Generate enterprise-grade Power Platform solution.
+    The pack doubles as a writer for ExpenseApprovalGenerator: staged paths
+    look like <pack>/<solution>/<artifact>. Appends are serialized with a lock,
+    so one pack can be shared by threads but not by processes.
+    """
 
-        Enterprise version includes multi-pattern generation, advanced
-        customization, and complete governance framework.
-        """
-        print("\n" + "="*70)
-        print("  Generating Enterprise Solution")
-        print("="*70)
+    MAGIC = b"PPOPACK1\n"
 
-        generator = self.AVAILABLE_PATTERNS['expense_approval']
-        solution = generator.generate(requirements)
+    def __init__(self, path: str, durability: str = 'batch'):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {DURABILITY_LEVELS}, not {durability!r}")
+        self.path = path
+        self.index_path = path + ".idx"
+        self.durability = durability
+        self._index = {}  # solution -> {artifact: (offset, length)}
+        self._reserved = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._data = None
+        self._index_file = None
+        self._map = None
+        self._reader = None
+        self._load_index()
 
-        print("\n" + "="*70)
-        print("  Solution Complete")
-        print("="*70)
-        print(f"\nGenerated: {solution['name']}")
-        print(f"Location: {solution['path']}")
-        print("\nFiles included:")
-        print("  ✓ app_definition.json - Model-Driven App configuration")
-        print("  ✓ governance.md - Comprehensive governance documentation")
-        print("  ✓ security_roles.json - Role-based access control definitions")
-
-        print("\nEnterprise version additionally includes:")
-        print("  • Dataverse table schemas with relationships")
-        print("  • Power Automate flow definitions")
-        print("  • Custom Page components (React)")
-        print("  • PCF controls for advanced UI")
-        print("  • PowerShell deployment automation")
-        print("  • Azure DevOps pipeline configuration")
-        print("  • Integration connectors and API documentation")
-        print("  • Executive dashboards and analytics")
-
-        print("\nNext steps:")
-        print("  1. Review governance.md for deployment requirements")
-        print("  2. Customize app_definition.json for your environment")
-        print("  3. Configure security_roles.json per your org structure")
-        print("  4. Contact for enterprise version with full ALM automation")
+    def _load_index(self):
+        good_bytes = 0
+        try:
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._index[entry['solution']] = {
+                        name: tuple(span) for name, span in entry['artifacts'].items()
+                    }
+                    good_bytes += len(line)
+        except FileNotFoundError:
+            return
+        if good_bytes != os.path.getsize(self.index_path):
+            # Drop a torn final line so later appends start on a clean line
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(good_bytes)
 
-        return solution
+    def _open_for_append(self):
+        if self._data is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._data = open(self.path, 'ab')
+            if self._data.tell() == 0:
+                self._data.write(self.MAGIC)
+            self._index_file = open(self.index_path, 'ab')
 
+    def solution_path(self, solution_id: str) -> str:
+        return os.path.join(self.path, solution_id)
 
-def main():
+    def reserve(self, solution_id: str) -> bool:
+        """Claim a solution ID for this pack; False if it is already taken"""
+        with self._lock:
+            if solution_id in self._index or solution_id in self._reserved:
+                return False
+            self._reserved.add(solution_id)
+            return True
+
+    def __contains__(self, solution_id: str) -> bool:
+        return solution_id in self._index
+
+    def solutions(self) -> List[str]:
+        return list(self._index)
+
+    def artifacts(self, solution_id: str) -> List[str]:
+        return list(self._index[solution_id])
+
+    # Writer interface (see ArtifactWriter)
+
+    def _staged(self) -> List:
+        staged = getattr(self._local, 'staged', None)
+        if staged is None:
+            staged = self._local.staged = []
+        return staged
+
+    def stage(self, destination: str, data: Union[bytes, Iterable[bytes]],
+              link_from: Optional[str] = None):
+        if not isinstance(data, bytes):
+            data = b"".join(data)  # appends are per solution, so chunks are joined here
+        solution_path, artifact = os.path.split(destination)
+        self._staged().append((os.path.basename(solution_path), artifact, data))
+
+    def commit(self) -> List[str]:
+        """Append every solution staged by this thread and index it"""
+        staged = self._staged()
+        self._local.staged = []
+
+        solutions = OrderedDict()
+        for solution_id, artifact, data in staged:
+            solutions.setdefault(solution_id, []).append((artifact, data))
+
+        committed = []
+        with self._lock:
+            self._open_for_append()
+            lines = []
+            for solution_id, files in solutions.items():
+                spans = {}
+                for artifact, data in files:
+                    spans[artifact] = (self._data.tell(), len(data))
+                    self._data.write(data)
+                    committed.append(os.path.join(self.path, solution_id, artifact))
+                lines.append((solution_id, spans))
+            self._data.flush()
+            if self.durability == 'solution':
+                os.fsync(self._data.fileno())
+
+            for solution_id, spans in lines:
+                entry = {'solution': solution_id, 'artifacts': spans}
+                self._index_file.write(json.dumps(entry, separators=(',', ':')).encode('utf-8') + b"\n")
+                self._index[solution_id] = spans
+                self._reserved.discard(solution_id)
+            self._index_file.flush()
+            if self.durability == 'solution':
+                os.fsync(self._index_file.fileno())
+        return committed
+
+    def abort(self):
+        self._local.staged = []
+
+    def flush(self, paths: Optional[List[str]] = None) -> int:
+        """fsync the pack and its index (paths are accepted for writer parity)"""
+        with self._lock:
+            if self._data is None:
+                return 0
+            self._data.flush()
+            self._index_file.flush()
+            if self.durability == 'none':
+                return 0
+            os.fsync(self._data.fileno())
+            os.fsync(self._index_file.fileno())
+        return 2
+
+    def close(self):
+        with self._lock:
+            for handle in (self._map, self._reader, self._data, self._index_file):
+                if handle is not None:
+                    handle.close()
+            self._map = self._reader = self._data = self._index_file = None
+
+    # Random-access reads
+
+    def read(self, solution_id: str, artifact: str) -> bytes:
+        """Return one artifact's bytes via the memory map"""
+        offset, length = self._index[solution_id][artifact]
+        with self._lock:
+            if self._data is not None:
+                self._data.flush()
+            if self._map is None or offset + length > len(self._map):
+                # The pack grew since it was mapped; remap to the current size
+                if self._map is not None:
+                    self._map.close()
+                if self._reader is None:
+                    self._reader = open(self.path, 'rb')
+                self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map[offset:offset + length]
+
+    def extract(self, solution_id: str, destination_dir: str,
+                writer: Optional['ArtifactWriter'] = None) -> str:
+        """Materialize one packed solution as a regular solution directory"""
+        writer = writer or ArtifactWriter()
+        solution_path = os.path.join(destination_dir, solution_id)
+        os.makedirs(solution_path, exist_ok=True)
+        try:
+            for artifact in self.artifacts(solution_id):
+                writer.stage(os.path.join(solution_path, artifact), self.read(solution_id, artifact))
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        return solution_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Content-defined chunking: a chunk ends after a line whose CRC matches
+# CHUNK_MASK once it holds CHUNK_MIN_BYTES, so an edit only changes the chunks
+# around it; no chunk grows past CHUNK_MAX_BYTES
+CHUNK_MIN_BYTES = 128
+CHUNK_MAX_BYTES = 64 * 1024
+CHUNK_MASK = 0x1
+
+
+def content_chunks(data: bytes) -> Iterator[memoryview]:
+    """Split data into content-defined chunks at line boundaries"""
+    view = memoryview(data)
+    start = position = 0
+    while position < len(data):
+        end = data.find(b"\n", position, start + CHUNK_MAX_BYTES)
+        if end < 0:
+            # No line end within the size cap: cut there (or at the end of data)
+            end = min(len(data), start + CHUNK_MAX_BYTES)
+            yield view[start:end]
+            start = position = end
+            continue
+        end += 1
+        if end - start >= CHUNK_MIN_BYTES and not zlib.crc32(view[position:end]) & CHUNK_MASK:
+            yield view[start:end]
+            start = end
+        position = end
+    if start < len(data):
+        yield view[start:]
+
+
+class BlobStore(SolutionPack):
+    """
+    Deduplicating pack: artifacts are split into content chunks and each
+    distinct chunk is stored once, however many solutions contain it.
+
+    Solutions sharing governance text or security roles hold references to
+    the same chunks. The index line for each solution lists the chunks it
+    added (SHA-256, offset, length) and each artifact as a list of chunk
+    numbers; read() and extract() reassemble artifacts from the memory map,
+    so files are only materialized on demand. Otherwise it behaves like
+    SolutionPack, including use as a generator writer.
+    """
+
+    MAGIC = b"PPOBLOB1\n"
+
+    def __init__(self, path: str, durability: str = 'batch'):
+        self._chunks = []    # chunk number -> (offset, length)
+        self._digests = {}   # SHA-256 digest -> chunk number
+        self.logical_bytes = 0
+        super().__init__(path, durability)
+
+    def _load_index(self):
+        good_bytes = 0
+        try:
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self._add_entry(entry)
+                    good_bytes += len(line)
+        except FileNotFoundError:
+            return
+        if good_bytes != os.path.getsize(self.index_path):
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(good_bytes)
+
+    def _add_entry(self, entry: Dict):
+        for digest, offset, length in entry['chunks']:
+            self._digests[bytes.fromhex(digest)] = len(self._chunks)
+            self._chunks.append((offset, length))
+        artifacts = {name: tuple(chunks) for name, chunks in entry['artifacts'].items()}
+        self._index[entry['solution']] = artifacts
+        self.logical_bytes += sum(self._chunks[chunk][1] for chunks in artifacts.values() for chunk in chunks)
+
+    def commit(self) -> List[str]:
+        """Append the new chunks of every solution staged by this thread and index it"""
+        staged = self._staged()
+        self._local.staged = []
+
+        # Hash outside the lock; only the lookups and appends are serialized
+        solutions = OrderedDict()
+        for solution_id, artifact, data in staged:
+            chunks = [(hashlib.sha256(chunk).digest(), chunk) for chunk in content_chunks(data)]
+            solutions.setdefault(solution_id, []).append((artifact, chunks))
+
+        committed = []
+        with self._lock:
+            self._open_for_append()
+            entries = []
+            for solution_id, files in solutions.items():
+                entry = {'solution': solution_id, 'chunks': [], 'artifacts': {}}
+                for artifact, chunks in files:
+                    numbers = []
+                    for digest, chunk in chunks:
+                        number = self._digests.get(digest)
+                        if number is None:
+                            number = self._digests[digest] = len(self._chunks)
+                            self._chunks.append((self._data.tell(), len(chunk)))
+                            entry['chunks'].append((digest.hex(),) + self._chunks[number])
+                            self._data.write(chunk)
+                        numbers.append(number)
+                    entry['artifacts'][artifact] = numbers
+                    committed.append(os.path.join(self.path, solution_id, artifact))
+                entries.append(entry)
+            self._data.flush()
+            if self.durability == 'solution':
+                os.fsync(self._data.fileno())
+
+            for entry in entries:
+                self._index_file.write(json.dumps(entry, separators=(',', ':')).encode('utf-8') + b"\n")
+                self._add_entry({'solution': entry['solution'], 'chunks': (),
+                                 'artifacts': entry['artifacts']})
+                self._reserved.discard(entry['solution'])
+            self._index_file.flush()
+            if self.durability == 'solution':
+                os.fsync(self._index_file.fileno())
+        return committed
+
+    def read(self, solution_id: str, artifact: str) -> bytes:
+        """Reassemble one artifact from its chunks via the memory map"""
+        chunks = [self._chunks[number] for number in self._index[solution_id][artifact]]
+        with self._lock:
+            if self._data is not None:
+                self._data.flush()
+            end = max((offset + length for offset, length in chunks), default=0)
+            if self._map is None or end > len(self._map):
+                if self._map is not None:
+                    self._map.close()
+                if self._reader is None:
+                    self._reader = open(self.path, 'rb')
+                self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+            return b"".join([self._map[offset:offset + length] for offset, length in chunks])
+
+    def stats(self) -> Dict:
+        """
+        Bytes referenced by solutions against distinct chunk bytes stored;
+        bytes_saved is net of the whole store on disk, index included.
+        """
+        with self._lock:
+            if self._data is not None:
+                self._data.flush()
+                self._index_file.flush()
+            stored = sum(length for _, length in self._chunks)
+            logical = self.logical_bytes
+            solutions, chunks = len(self._index), len(self._chunks)
+        disk = sum(os.path.getsize(path) for path in (self.path, self.index_path) if os.path.exists(path))
+        return {
+            'solutions': solutions,
+            'chunks': chunks,
+            'logical_bytes': logical,
+            'stored_bytes': stored,
+            'disk_bytes': disk,
+            'bytes_saved': logical - disk,
+            'dedup_ratio': logical / stored if stored else 1.0,
+        }
+
+
+def open_pack(path: str, durability: str = 'batch') -> SolutionPack:
+    """Open an existing pack file as a SolutionPack or BlobStore, by its header"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(BlobStore.MAGIC))
+    return (BlobStore if magic == BlobStore.MAGIC else SolutionPack)(path, durability)
+
+
+def is_pack(path: str) -> bool:
+    """Whether path is a SolutionPack or BlobStore file, by its header"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SolutionPack.MAGIC)) in (SolutionPack.MAGIC, BlobStore.MAGIC)
+    except OSError:
+        return False
+
+
+# Requirement fields stored as index columns
+INDEX_FIELDS = ('business_problem', 'pain_point', 'approval_levels', 'compliance')
+
+# Solution IDs embed their creation time (see _create_solution_dir)
+_SOLUTION_TIME = re.compile(r"_(\d{8}_\d{6})_")
+
+# Answers like "2 (manager + director)" are indexed by the number they start with
+_LEADING_INT = re.compile(r"\s*(\d+)")
+
+# FIELD OP VALUE filters accepted by SolutionIndex.query; ~ means "contains"
+_FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(>=|<=|!=|=|<|>|~)\s*(.*?)\s*$")
+
+
+class SolutionIndex:
+    """
+    SQLite index of generated solutions, kept current by the generator.
+
+    One row per solution (ID, pattern, location, requirement fields, total
+    size, generation time) and one per artifact (SHA-256, size), so questions
+    like "approval_levels >= 3 with SOX compliance" need no file reads.
+    Rows are buffered and inserted in batches on a WAL-mode database; flush()
+    or close() makes them visible to other readers. Processes may share one
+    index file, each with its own SolutionIndex.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS solutions (
+            key INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            pattern TEXT NOT NULL,
+            location TEXT NOT NULL,
+            generator_version TEXT,
+            business_problem TEXT,
+            pain_point TEXT,
+            approval_levels INTEGER,
+            compliance TEXT,
+            total_bytes INTEGER,
+            generated_at REAL,
+            generation_ms REAL
+        );
+        CREATE INDEX IF NOT EXISTS solutions_approval_levels ON solutions (approval_levels, compliance);
+        CREATE INDEX IF NOT EXISTS solutions_generated_at ON solutions (generated_at);
+        CREATE TABLE IF NOT EXISTS artifacts (
+            solution INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            sha256 BLOB NOT NULL,
+            bytes INTEGER NOT NULL,
+            PRIMARY KEY (solution, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS artifacts_sha256 ON artifacts (sha256);
+    """
+
+    COLUMNS = ('id', 'pattern', 'location', 'generator_version') + INDEX_FIELDS + (
+        'total_bytes', 'generated_at', 'generation_ms')
+    NUMERIC_COLUMNS = ('approval_levels', 'total_bytes', 'generated_at', 'generation_ms')
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        import sqlite3  # only runs that index solutions pay for sqlite
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(self.SCHEMA)
+
+    def add(self, solution_id: str, pattern: str, location: str, requirements: Dict,
+            artifacts: Dict, generated_at: Optional[float] = None, seconds: Optional[float] = None,
+            generator_version: str = GENERATOR_VERSION):
+        """
+        Queue one solution (replacing any earlier row for it); artifacts are
+        manifest records. approval_levels is stored as the number its answer
+        starts with, or NULL without one, so it compares numerically.
+        """
+        fields = dict(zip(INDEX_FIELDS, map(requirements.get, INDEX_FIELDS)))
+        levels = _LEADING_INT.match(str(fields['approval_levels'] or ""))
+        fields['approval_levels'] = int(levels.group(1)) if levels else None
+        row = (solution_id, pattern, location, generator_version) + tuple(fields.values()) + (
+            sum(record['bytes'] for record in artifacts.values()),
+            time.time() if generated_at is None else generated_at,
+            None if seconds is None else seconds * 1000,
+        )
+        files = [(solution_id, name, bytes.fromhex(record['sha256']), record['bytes'])
+                 for name, record in artifacts.items()]
+        with self._lock:
+            self._pending.append((row, files))
+            if len(self._pending) >= self.batch_size:
+                self._write()
+
+    def flush(self):
+        with self._lock:
+            self._write()
+
+    def _write(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        # A solution queued twice keeps its latest row; each INSERT OR REPLACE
+        # would give it a new key and orphan the artifacts added under the last
+        pending = list({row[0]: (row, files) for row, files in pending}.values())
+        with self._db:
+            # Artifacts hang off the solution's integer key, which a replaced row does not keep
+            self._db.executemany("DELETE FROM artifacts WHERE solution = (SELECT key FROM solutions WHERE id = ?)",
+                                 [(row[0],) for row, _ in pending])
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO solutions ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                [row for row, _ in pending]
+            )
+            self._db.executemany("INSERT INTO artifacts SELECT key, ?, ?, ? FROM solutions WHERE id = ?",
+                                 [file[1:] + file[:1] for _, files in pending for file in files])
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._write()
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def parse_filter(cls, text: str) -> Tuple[str, str, object]:
+        """Parse 'approval_levels>=3' or 'compliance~SOX' into (column, operator, value)"""
+        match = _FILTER_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"invalid filter {text!r}: expected FIELD OP VALUE, OP one of = != < <= > >= ~")
+        column, operator, value = match.groups()
+        if column not in cls.COLUMNS + ('sha256',):
+            raise ValueError(f"unknown filter field {column!r}; "
+                             f"expected one of {', '.join(cls.COLUMNS + ('sha256',))}")
+        if column in cls.NUMERIC_COLUMNS and operator != '~':
+            try:
+                value = float(value)
+            except ValueError:
+                if column != 'generated_at':
+                    raise ValueError(f"{column} needs a number, not {value!r}") from None
+                value = datetime.fromisoformat(value).timestamp()
+        return column, operator, value
+
+    def _where(self, filters: Iterable) -> Tuple[str, List]:
+        clauses, params = [], []
+        for item in filters:
+            column, operator, value = self.parse_filter(item) if isinstance(item, str) else item
+            if column == 'sha256':
+                clauses.append("key IN (SELECT solution FROM artifacts WHERE sha256 = ?)")
+                value = bytes.fromhex(value)
+            elif operator == '~':
+                value = "%" + str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+            else:
+                clauses.append(f"{column} {operator} ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, filters: Iterable = (), limit: Optional[int] = None,
+              order_by: str = 'generated_at') -> List[Dict]:
+        """
+        Solutions matching every filter ('field OP value' strings or
+        (column, operator, value) tuples), oldest first by default.
+        """
+        if order_by not in self.COLUMNS:
+            raise ValueError(f"cannot order by {order_by!r}")
+        where, params = self._where(filters)
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM solutions{where} ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        self.flush()
+        with self._lock:
+            return [dict(zip(self.COLUMNS, row)) for row in self._db.execute(sql, params)]
+
+    def count(self, filters: Iterable = ()) -> int:
+        where, params = self._where(filters)
+        self.flush()
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM solutions{where}", params).fetchone()[0]
+
+    def artifacts(self, solution_id: str) -> Dict[str, Dict]:
+        self.flush()
+        with self._lock:
+            rows = self._db.execute("SELECT name, sha256, bytes FROM artifacts WHERE solution = "
+                                    "(SELECT key FROM solutions WHERE id = ?) ORDER BY name", (solution_id,))
+            return {name: {'sha256': sha256.hex(), 'bytes': size} for name, sha256, size in rows}
+
+    def rebuild(self, paths: Iterable[str]) -> int:
+        """
+        Replace the index with what is on disk: solution directories, pack
+        files, or directories holding either, read from their manifests.
+        Returns the number of solutions indexed.
+        """
+        with self._lock:
+            self._pending = []
+            with self._db:
+                self._db.execute("DELETE FROM artifacts")
+                self._db.execute("DELETE FROM solutions")
+
+        indexed = 0
+        for path in paths:
+            for location, manifest, modified in self._stored_manifests(path):
+                solution_id = manifest.get('solution') or os.path.basename(location)
+                stamp = _SOLUTION_TIME.search(solution_id)
+                generated_at = (datetime.strptime(stamp.group(1), '%Y%m%d_%H%M%S').timestamp()
+                                if stamp else modified)
+                self.add(solution_id, manifest.get('type', 'expense_approval'), location,
+                         manifest.get('requirements') or {}, manifest.get('artifacts') or {},
+                         generated_at, generator_version=manifest.get('generator_version'))
+                indexed += 1
+        self.flush()
+        return indexed
+
+    @staticmethod
+    def _stored_manifests(path: str) -> Iterator[Tuple[str, Dict, float]]:
+        """(location, manifest, modification time) for every solution under path"""
+        if os.path.isfile(path):
+            with open_pack(path) as pack:
+                modified = os.path.getmtime(path)
+                for solution_id in pack.solutions():
+                    if SOLUTION_MANIFEST in pack.artifacts(solution_id):
+                        yield (pack.solution_path(solution_id),
+                               json.loads(pack.read(solution_id, SOLUTION_MANIFEST)), modified)
+            return
+
+        candidates = [path] if os.path.exists(os.path.join(path, SOLUTION_MANIFEST)) else sorted(
+            os.path.join(path, name) for name in os.listdir(path))
+        for location in candidates:
+            if os.path.isfile(location):
+                if is_pack(location):
+                    yield from SolutionIndex._stored_manifests(location)
+                continue
+            manifest_path = os.path.join(location, SOLUTION_MANIFEST)
+            try:
+                with open(manifest_path, 'rb') as f:
+                    manifest = json.load(f)
+                modified = os.path.getmtime(manifest_path)
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                continue
+            yield location, manifest, modified
+
+
+# Dataverse attribute types the schema builder accepts
+ATTRIBUTE_TYPES = (
+    'String', 'Memo', 'Integer', 'BigInt', 'Decimal', 'Double', 'Money', 'Boolean',
+    'DateTime', 'OptionSet', 'MultiSelectOptionSet', 'Lookup', 'Customer', 'Owner',
+    'Image', 'File', 'Uniqueidentifier',
+)
+_ATTRIBUTE_CODES = {name: code for code, name in enumerate(ATTRIBUTE_TYPES)}
+
+# TableSchema.required codes: unspecified (key omitted), True, False
+_REQUIRED_CODES = {None: 0, True: 1, False: 2}
+_REQUIRED_VALUES = (None, True, False)
+
+# Schema generated when requirements carry no table specs
+DEFAULT_TABLES = [
+    {
+        "logicalName": "cr_expenserequest",
+        "displayName": "Expense Request",
+        "attributes": [
+            {"name": "cr_amount", "type": "Money", "required": True},
+            {"name": "cr_category", "type": "OptionSet", "required": True},
+            {"name": "cr_justification", "type": "Memo", "required": True},
+            {"name": "cr_status", "type": "OptionSet", "required": True},
+            {"name": "cr_approver", "type": "Lookup", "target": "systemuser"}
+        ]
+    }
+]
+
+
+def _json_default(obj):
+    """json default hook for objects that convert themselves lazily (e.g. schemas)"""
+    to_jsonable = getattr(obj, 'to_jsonable', None)
+    if to_jsonable is None:
+        if hasattr(obj, '__next__'):
+            return list(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_jsonable()
+
+
+# Containers with more items than this are streamed item by item
+STREAM_MIN_ITEMS = 64
+
+# Size of the byte chunks iter_json yields
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_encode_indented = json.JSONEncoder(indent=2, default=_json_default).encode
+_encode_compact = json.JSONEncoder(separators=(',', ':'), default=_json_default).encode
+
+
+def _is_lazy(value) -> bool:
+    return hasattr(value, 'to_jsonable') or (
+        hasattr(value, '__next__') and not isinstance(value, (str, bytes, dict, list, tuple))
+    )
+
+
+def _needs_streaming(value) -> bool:
+    """
+    Whether value should be expanded piece by piece rather than encoded whole:
+    it is lazy, large, or holds something that is at any depth.
+    """
+    if _is_lazy(value):
+        return True
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return False
+    return len(value) > STREAM_MIN_ITEMS or any(map(_needs_streaming, value))
+
+
+def _json_pieces(value, compact: bool, level: int) -> Iterator[str]:
+    """
+    Yield the JSON text of value in pieces, byte-identical to json.dumps with
+    indent=2 (or compact separators). Lazy values (to_jsonable objects and
+    iterators) are expanded as they are reached, as are containers that are
+    large or hold a large or lazy value; other subtrees are encoded in one call.
+    """
+    if hasattr(value, 'to_jsonable'):
+        value = value.to_jsonable()
+    if _is_lazy(value):
+        items, is_dict = value, False
+    elif _needs_streaming(value):
+        items, is_dict = (value.items(), True) if isinstance(value, dict) else (value, False)
+    else:
+        items = None
+
+    if items is None:
+        text = _encode_compact(value) if compact else _encode_indented(value)
+        yield text if compact or not level else text.replace("\n", "\n" + "  " * level)
+        return
+
+    if compact:
+        opening, separator, closing, colon = "", ",", "", ":"
+    else:
+        opening = "\n" + "  " * (level + 1)
+        separator = "," + opening
+        closing = "\n" + "  " * level
+        colon = ": "
+
+    yield "{" if is_dict else "["
+    if isinstance(items, (list, tuple)) and not any(map(_needs_streaming, items)):
+        # A long list of plain items: encode it in slices, one call per slice
+        encode = _encode_compact if compact else _encode_indented
+        for start in range(0, len(items), STREAM_MIN_ITEMS):
+            text = encode(items[start:start + STREAM_MIN_ITEMS])[1:-1]
+            if not compact:
+                text = text.rstrip("\n").replace("\n", "\n" + "  " * level)
+            yield text if not start else "," + text
+        yield closing + "]"
+        return
+
+    first = True
+    for item in items:
+        yield opening if first else separator
+        first = False
+        if is_dict:
+            key, item = item
+            yield json.dumps(key if isinstance(key, str) else str(key)) + colon
+        yield from _json_pieces(item, compact, level + 1)
+    if not first:
+        yield closing
+    yield "}" if is_dict else "]"
+
+
+def iter_json(value, compact: bool = False) -> Iterator[bytes]:
+    """
+    Serialize value as UTF-8 JSON in chunks of about STREAM_CHUNK_BYTES.
+
+    Output matches json.dumps(value, indent=2) (or compact separators with
+    compact=True), but nested generators and to_jsonable objects are only
+    expanded as the writer reaches them, so peak memory is bounded by the
+    largest plain subtree rather than the whole document.
+    """
+    buffer = []
+    size = 0
+    for piece in _json_pieces(value, compact, 0):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_BYTES:
+            yield "".join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode('utf-8')
+
+
+class TableSchema:
+    """
+    One Dataverse table, with its attributes stored column-wise.
+
+    Names live in a list, types and required flags as one byte each, and
+    lookup targets in a sparse dict, so an attribute costs a few dozen bytes
+    instead of a dict. Attribute dicts are only created while serializing.
+    """
+
+    __slots__ = ('logical_name', 'display_name', 'names', 'types', 'required', 'targets')
+
+    def __init__(self, logical_name: str, display_name: Optional[str] = None):
+        self.logical_name = logical_name
+        self.display_name = display_name or logical_name
+        self.names = []
+        self.types = bytearray()
+        self.required = bytearray()
+        self.targets = {}
+
+    def add_attribute(self, name: str, type: str = 'String', required: Optional[bool] = None,
+                      target: Optional[str] = None):
+        code = _ATTRIBUTE_CODES.get(type)
+        if code is None:
+            raise ValueError(f"{self.logical_name}.{name}: unknown attribute type {type!r}")
+        if type == 'Lookup' and not target:
+            raise ValueError(f"{self.logical_name}.{name}: Lookup attributes need a target")
+        if required not in _REQUIRED_CODES:
+            raise ValueError(f"{self.logical_name}.{name}: required must be true or false")
+        if target:
+            self.targets[len(self.names)] = target
+        self.names.append(name)
+        self.types.append(code)
+        self.required.append(_REQUIRED_CODES[required])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def to_jsonable(self) -> Dict:
+        targets = self.targets
+        attributes = []
+        for index, (name, code, required) in enumerate(zip(self.names, self.types, self.required)):
+            attribute = {"name": name, "type": ATTRIBUTE_TYPES[code]}
+            if required:
+                attribute["required"] = _REQUIRED_VALUES[required]
+            if index in targets:
+                attribute["target"] = targets[index]
+            attributes.append(attribute)
+        return {"logicalName": self.logical_name, "displayName": self.display_name,
+                "attributes": attributes}
+
+
+class DataverseSchema:
+    """
+    The tables of a generated app definition.
+
+    Built from table specs in the app-definition shape ({"logicalName",
+    "displayName", "attributes": [{"name", "type", "required", "target"}]}).
+    Serializes through _json_default one table at a time, so peak memory is
+    the compact columns plus the largest single table, not the whole model
+    as nested dicts.
+    """
+
+    __slots__ = ('tables', '_by_name')
+
+    def __init__(self):
+        self.tables = []
+        self._by_name = {}
+
+    @classmethod
+    def from_specs(cls, specs: List[Dict]) -> 'DataverseSchema':
+        schema = cls()
+        for position, spec in enumerate(specs, start=1):
+            try:
+                logical_name = spec.get('logicalName') or spec['name']
+            except (AttributeError, KeyError):
+                raise ValueError(f"table spec {position}: needs a logicalName") from None
+            table = schema.add_table(logical_name, spec.get('displayName'))
+            add = table.add_attribute
+            for attribute in spec.get('attributes', ()):
+                try:
+                    add(attribute['name'], attribute.get('type', 'String'),
+                        attribute.get('required'), attribute.get('target'))
+                except (KeyError, TypeError, AttributeError):
+                    raise ValueError(f"{logical_name}: malformed attribute spec {attribute!r}") from None
+        return schema
+
+    def add_table(self, logical_name: str, display_name: Optional[str] = None) -> TableSchema:
+        if logical_name in self._by_name:
+            raise ValueError(f"duplicate table {logical_name!r}")
+        table = self._by_name[logical_name] = TableSchema(logical_name, display_name)
+        self.tables.append(table)
+        return table
+
+    def table(self, logical_name: str) -> TableSchema:
+        return self._by_name[logical_name]
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def attribute_count(self) -> int:
+        return sum(len(table) for table in self.tables)
+
+    def to_jsonable(self) -> List[TableSchema]:
+        return self.tables
+
+
+# Security roles generated for every solution; with table specs, each role
+# gets the same privileges on every table
+DEFAULT_SECURITY_ROLES = {
+    "roles": [
+        {
+            "name": "Expense Admin",
+            "description": "Full administrative access to expense system",
+            "privileges": {
+                "cr_expenserequest": {
+                    "create": "Organization",
+                    "read": "Organization",
+                    "write": "Organization",
+                    "delete": "Organization",
+                    "assign": "Organization",
+                    "share": "Organization"
+                }
+            },
+            "auditEnabled": True
+        },
+        {
+            "name": "Expense Approver",
+            "description": "Can approve expense requests within scope",
+            "privileges": {
+                "cr_expenserequest": {
+                    "create": "None",
+                    "read": "BusinessUnit",
+                    "write": "BusinessUnit",
+                    "delete": "None",
+                    "assign": "BusinessUnit",
+                    "share": "None"
+                }
+            },
+            "auditEnabled": True,
+            "mfaRequired": True
+        },
+        {
+            "name": "Expense Submitter",
+            "description": "Can submit and track own expense requests",
+            "privileges": {
+                "cr_expenserequest": {
+                    "create": "User",
+                    "read": "User",
+                    "write": "User",
+                    "delete": "User",
+                    "assign": "None",
+                    "share": "None"
+                }
+            },
+            "auditEnabled": True
+        }
+    ],
+    "note": "Enterprise version includes advanced role hierarchies and dynamic security groups"
+}
+
+# Privilege scopes, narrowest first; the matrix stores each as its index
+SCOPE_LEVELS = ('None', 'User', 'BusinessUnit', 'Organization')
+_SCOPE_CODES = {name: code for code, name in enumerate(SCOPE_LEVELS)}
+
+# Table privileges, in security_roles.json order
+PRIVILEGES = ('create', 'read', 'write', 'delete', 'assign', 'share')
+_PRIVILEGE_INDEX = {name: index for index, name in enumerate(PRIVILEGES)}
+
+_numpy_module = None
+
+
+def _numpy():
+    """NumPy when installed, otherwise None (PrivilegeMatrix then uses plain loops)"""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+def use_numpy(enabled: bool = True) -> bool:
+    """
+    Switch the vectorized paths on (the default) or off, for example to compare
+    them with the plain-Python fallbacks. Returns whether NumPy is now in use.
+    """
+    global _numpy_module
+    _numpy_module = None if enabled else False
+    return _numpy() is not None
+
+
+class PrivilegeMatrix:
+    """
+    Security role privileges as a roles x tables x privileges matrix of scope
+    levels (indexes into SCOPE_LEVELS), one byte per cell.
+
+    The cells live in a bytearray; with NumPy installed, `levels` is a
+    zero-copy int8 view of it and checks and diffs run as vectorized array
+    operations, fast enough for 1k roles x 1k tables interactively. Without
+    NumPy `levels` is None and the same methods fall back to plain loops.
+
+    Converts to and from the security_roles.json shape, keeping each role's
+    other fields (description, auditEnabled, ...) and which tables it lists.
+    """
+
+    def __init__(self, roles: List[str], tables: List[str],
+                 role_info: Optional[List[Dict]] = None, extra: Optional[Dict] = None):
+        self.roles = list(roles)
+        self.tables = list(tables)
+        self._role_index = {name: index for index, name in enumerate(self.roles)}
+        self._table_index = {name: index for index, name in enumerate(self.tables)}
+        # Each role's JSON fields, with 'privileges' marking where the matrix goes
+        self.role_info = role_info or [{'name': name, 'privileges': None} for name in self.roles]
+        self.extra = dict(extra or {})
+        self.cells = bytearray(len(self.roles) * len(self.tables) * len(PRIVILEGES))
+        self.listed = bytearray(len(self.roles) * len(self.tables))
+
+        np = _numpy()
+        if np is not None:
+            shape = (len(self.roles), len(self.tables))
+            self.levels = np.frombuffer(self.cells, dtype=np.int8).reshape(shape + (len(PRIVILEGES),))
+            self.present = np.frombuffer(self.listed, dtype=np.bool_).reshape(shape)
+        else:
+            self.levels = self.present = None
+
+    @classmethod
+    def from_json(cls, document: Dict) -> 'PrivilegeMatrix':
+        """Build from the security_roles.json shape ({'roles': [...], ...})"""
+        roles, tables, role_info = [], {}, []
+        for role in document.get('roles', ()):
+            roles.append(role['name'])
+            role_info.append({key: (None if key == 'privileges' else value)
+                              for key, value in role.items()})
+            for table in role.get('privileges', {}):
+                tables.setdefault(table, None)
+
+        matrix = cls(roles, list(tables), role_info,
+                     {key: value for key, value in document.items() if key != 'roles'})
+        for role in document.get('roles', ()):
+            for table, scopes in role.get('privileges', {}).items():
+                matrix.grant(role['name'], table, scopes)
+        return matrix
+
+    def _cell(self, role: str, table: str) -> int:
+        return (self._role_index[role] * len(self.tables) + self._table_index[table]) * len(PRIVILEGES)
+
+    def grant(self, role: str, table: str, scopes: Dict[str, str]):
+        """Set role's scopes on table ({privilege: scope}) and list the table for the role"""
+        base = self._cell(role, table)
+        for privilege, scope in scopes.items():
+            try:
+                self.cells[base + _PRIVILEGE_INDEX[privilege]] = _SCOPE_CODES[scope]
+            except KeyError:
+                raise ValueError(f"{role}/{table}: unknown privilege or scope "
+                                 f"{privilege!r}: {scope!r}") from None
+        self.listed[base // len(PRIVILEGES)] = 1
+
+    def scope(self, role: str, table: str, privilege: str) -> str:
+        return SCOPE_LEVELS[self.cells[self._cell(role, table) + _PRIVILEGE_INDEX[privilege]]]
+
+    def fill_from(self, template: 'PrivilegeMatrix', table: str):
+        """Give each role, on every table, the scopes it has in template on table"""
+        width = len(PRIVILEGES)
+        source = template._table_index[table]
+        if self.levels is not None:
+            rows = [template._role_index[role] for role in self.roles]
+            self.levels[...] = template.levels[rows, source:source + 1, :]
+            self.present[...] = template.present[rows, source:source + 1]
+            return
+        for index, role in enumerate(self.roles):
+            start = (template._role_index[role] * len(template.tables) + source) * width
+            row = template.cells[start:start + width]
+            self.cells[index * len(self.tables) * width:(index + 1) * len(self.tables) * width] = \
+                row * len(self.tables)
+            listed = template.listed[start // width]
+            self.listed[index * len(self.tables):(index + 1) * len(self.tables)] = \
+                bytes([listed]) * len(self.tables)
+
+    def holders(self, privilege: str, min_scope: str,
+                exclude_roles: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """(role, table) pairs where privilege is held at min_scope or wider"""
+        p, level = _PRIVILEGE_INDEX[privilege], _SCOPE_CODES[min_scope]
+        excluded = {self._role_index[role] for role in exclude_roles if role in self._role_index}
+        if self.levels is not None:
+            mask = self.levels[:, :, p] >= level
+            if excluded:
+                mask[sorted(excluded), :] = False
+            rows, columns = mask.nonzero()
+            return [(self.roles[r], self.tables[t]) for r, t in zip(rows.tolist(), columns.tolist())]
+
+        width, tables = len(PRIVILEGES), len(self.tables)
+        cells = self.cells
+        return [
+            (role, self.tables[t])
+            for r, role in enumerate(self.roles) if r not in excluded
+            for t in range(tables) if cells[(r * tables + t) * width + p] >= level
+        ]
+
+    def violations(self, privilege: str, max_scope: str,
+                   allowed_roles: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """
+        (role, table) pairs where a role outside allowed_roles holds privilege
+        wider than max_scope, e.g. violations('delete', 'BusinessUnit',
+        ['Expense Admin']) finds Organization-wide delete held by anyone else.
+        """
+        wider = SCOPE_LEVELS[_SCOPE_CODES[max_scope] + 1:]
+        return self.holders(privilege, wider[0], allowed_roles) if wider else []
+
+    def conflicts(self, first: Tuple[str, str], second: Tuple[str, str],
+                  allowed_roles: Iterable[str] = ()) -> List[Tuple[str, str]]:
+        """
+        Segregation-of-duties check: (role, table) pairs where one role holds
+        both (privilege, min_scope) grants on the same table.
+        """
+        if self.levels is not None:
+            (p1, s1), (p2, s2) = [(_PRIVILEGE_INDEX[p], _SCOPE_CODES[s]) for p, s in (first, second)]
+            mask = (self.levels[:, :, p1] >= s1) & (self.levels[:, :, p2] >= s2)
+            excluded = sorted({self._role_index[r] for r in allowed_roles if r in self._role_index})
+            if excluded:
+                mask[excluded, :] = False
+            rows, columns = mask.nonzero()
+            return [(self.roles[r], self.tables[t]) for r, t in zip(rows.tolist(), columns.tolist())]
+        both = set(self.holders(*second, exclude_roles=allowed_roles))
+        return [pair for pair in self.holders(*first, exclude_roles=allowed_roles) if pair in both]
+
+    def diff(self, other: 'PrivilegeMatrix') -> Dict:
+        """
+        Compare with another role set: roles and tables only on one side, and
+        every (role, table, privilege, before, after) change on shared ones.
+        """
+        roles = [role for role in self.roles if role in other._role_index]
+        tables = [table for table in self.tables if table in other._table_index]
+        changes = []
+        aligned = roles == self.roles == other.roles and tables == self.tables == other.tables
+        if self.levels is not None and roles and tables:
+            np = _numpy()
+            if aligned:
+                mine, theirs = self.levels, other.levels
+            else:
+                mine = self.levels[np.ix_([self._role_index[r] for r in roles],
+                                          [self._table_index[t] for t in tables])]
+                theirs = other.levels[np.ix_([other._role_index[r] for r in roles],
+                                             [other._table_index[t] for t in tables])]
+            for r, t, p in zip(*(axis.tolist() for axis in (mine != theirs).nonzero())):
+                changes.append((roles[r], tables[t], PRIVILEGES[p],
+                                SCOPE_LEVELS[mine[r, t, p]], SCOPE_LEVELS[theirs[r, t, p]]))
+        else:
+            width = len(PRIVILEGES)
+            row = len(tables) * width
+            for r, role in enumerate(roles):
+                # Skip unchanged roles in one comparison when the layouts match
+                if aligned and self.cells[r * row:(r + 1) * row] == other.cells[r * row:(r + 1) * row]:
+                    continue
+                for table in tables:
+                    a, b = self._cell(role, table), other._cell(role, table)
+                    if self.cells[a:a + width] != other.cells[b:b + width]:
+                        for p in range(width):
+                            if self.cells[a + p] != other.cells[b + p]:
+                                changes.append((role, table, PRIVILEGES[p], SCOPE_LEVELS[self.cells[a + p]],
+                                                SCOPE_LEVELS[other.cells[b + p]]))
+        return {
+            'added_roles': [role for role in other.roles if role not in self._role_index],
+            'removed_roles': [role for role in self.roles if role not in other._role_index],
+            'added_tables': [table for table in other.tables if table not in self._table_index],
+            'removed_tables': [table for table in self.tables if table not in other._table_index],
+            'changes': changes,
+        }
+
+    def _role_documents(self) -> Iterator[Dict]:
+        width, tables = len(PRIVILEGES), len(self.tables)
+        for r, info in enumerate(self.role_info):
+            privileges = {}
+            for t, table in enumerate(self.tables):
+                if self.listed[r * tables + t]:
+                    base = (r * tables + t) * width
+                    privileges[table] = {privilege: SCOPE_LEVELS[code] for privilege, code
+                                         in zip(PRIVILEGES, self.cells[base:base + width])}
+            role = dict(info)
+            role['privileges'] = privileges
+            yield role
+
+    def to_jsonable(self) -> Dict:
+        """The security_roles.json shape; roles are produced one at a time"""
+        document = {'roles': self._role_documents()}
+        document.update(self.extra)
+        return document
+
+
+class _DigestStream:
+    """Byte chunks that are hashed and counted as a writer consumes them"""
+
+    __slots__ = ('_chunks', 'sha256', 'size')
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self.sha256.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+
+
+class ExpenseApprovalGenerator:
+    """
+    Generates complete expense approval workflow solution.
+    Enterprise version includes 4 additional solution patterns.
+    """
+
+    def __init__(self, output_dir: str = "sample_output",
+                 cache: Optional[ArtifactCache] = None,
+                 writer: Optional[ArtifactWriter] = None,
+                 compact: bool = False, index: Optional[SolutionIndex] = None):
+        # writer may also be a SolutionPack, which packs each solution into
+        # one archive file instead of a directory. compact writes JSON without
+        # indentation. index records every solution written.
+        self.output_dir = output_dir
+        self.cache = cache
+        self.writer = writer or ArtifactWriter()
+        self.compact = compact
+        self.index = index
+
+    def generate(self, requirements: Dict) -> Dict:
+        """
+        Generate expense approval solution with full governance.
+
+        Enterprise version includes advanced error handling,
+        environment detection, and extended customization options.
+        """
+        start = time.perf_counter()
+        solution_name, solution_path = self._create_solution_dir()
+        self._announce(solution_name)
+
+        try:
+            with TRACER.span('generate', solution=solution_name):
+                artifacts = {}
+                for artifact in ARTIFACT_INPUTS:
+                    artifacts[artifact] = self._stage_artifact(solution_path, artifact, requirements)
+                self._stage_manifest(solution_path, solution_name, requirements, artifacts)
+                with TRACER.span('commit'):
+                    self.writer.commit()
+        except BaseException:
+            self.writer.abort()
+            raise
+
+        self._index_solution(solution_name, solution_path, requirements, artifacts, start)
+        return self._generated(solution_name, solution_path)
+
+    async def generate_async(self, requirements: Dict, executor=None) -> Dict:
+        """
+        Generate a solution without blocking the event loop.
+
+        Each artifact is built and written in its own executor thread, so one
+        artifact's file write overlaps the next one's construction, and many
+        concurrent calls overlap across solutions. The files are committed
+        together once all of them are written, exactly as generate() does.
+        Packs append sequentially, so with a SolutionPack writer the whole
+        generate() call is offloaded instead.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if isinstance(self.writer, SolutionPack):
+            return await loop.run_in_executor(executor, self.generate, requirements)
+
+        start = time.perf_counter()
+        solution_name, solution_path = await loop.run_in_executor(executor, self._create_solution_dir)
+        self._announce(solution_name)
+
+        staged = []
+        try:
+            with TRACER.span('generate', solution=solution_name):
+                # Wait for every write, even after a failure, so abort sees them all
+                records = await asyncio.gather(*(
+                    loop.run_in_executor(executor, self._prepare_artifact,
+                                         solution_path, artifact, requirements, staged)
+                    for artifact in ARTIFACT_INPUTS
+                ), return_exceptions=True)
+                for record in records:
+                    if isinstance(record, BaseException):
+                        raise record
+                artifacts = dict(zip(ARTIFACT_INPUTS, records))
+                manifest = self._manifest_chunks(solution_name, requirements, artifacts)
+                staged.append(await loop.run_in_executor(
+                    executor, self.writer.prepare,
+                    os.path.join(solution_path, SOLUTION_MANIFEST), manifest
+                ))
+                with TRACER.span('commit'):
+                    await loop.run_in_executor(executor, self.writer.commit, staged)
+        except BaseException:
+            self.writer.abort(staged)
+            raise
+
+        self._index_solution(solution_name, solution_path, requirements, artifacts, start)
+        return self._generated(solution_name, solution_path)
+
+    def _index_solution(self, solution_name: str, solution_path: str, requirements: Dict,
+                        artifacts: Dict, start: float):
+        if self.index is not None:
+            self.index.add(solution_name, 'expense_approval', solution_path, requirements, artifacts,
+                           seconds=time.perf_counter() - start)
+
+    def _announce(self, solution_name: str):
+        OUTPUT.detail(f"\nGenerating enterprise-grade solution: {solution_name}")
+        OUTPUT.detail("Components:")
+        OUTPUT.detail("  ✓ Model-Driven App configuration")
+        OUTPUT.detail("  ✓ Dataverse table schemas")
+        OUTPUT.detail("  ✓ Power Automate approval flow")
+        OUTPUT.detail("  ✓ Security role definitions")
+        OUTPUT.detail("  ✓ Governance documentation")
+        OUTPUT.detail("  ✓ ALM deployment package")
+
+    def _generated(self, solution_name: str, solution_path: str) -> Dict:
+        OUTPUT.event('solution_generated', name=solution_name, path=solution_path,
+                     type='expense_approval')
+        OUTPUT.detail(f"\n✓ Solution generated: {solution_path}")
+        OUTPUT.detail("\nEnterprise version includes:")
+        OUTPUT.detail("  • Advanced multi-level approval routing")
+        OUTPUT.detail("  • Integration with existing approval systems")
+        OUTPUT.detail("  • Custom approval policies and thresholds")
+        OUTPUT.detail("  • Automated cost center validation")
+        OUTPUT.detail("  • Executive dashboard and analytics")
+
+        return {
+            'name': solution_name,
+            'path': solution_path,
+            'type': 'expense_approval'
+        }
+
+    def regenerate(self, solution_path: str, requirements: Dict) -> Dict:
+        """
+        Bring an existing solution up to date with new requirements.
+
+        Only artifacts whose input fingerprint changed (or whose file is
+        missing or has the wrong size) are rebuilt and rewritten; the rest are
+        left untouched on disk. Solutions without a manifest are rebuilt fully.
+        Packed solutions are immutable and cannot be regenerated.
+        """
+        if isinstance(self.writer, SolutionPack):
+            raise ValueError("packed solutions cannot be regenerated; extract them first")
+        start = time.perf_counter()
+        manifest = self._read_manifest(solution_path)
+        recorded = manifest.get('artifacts', {})
+        solution_name = manifest.get('solution', os.path.basename(os.path.normpath(solution_path)))
+
+        artifacts = {}
+        rewritten = []
+        try:
+            for artifact in ARTIFACT_INPUTS:
+                record = recorded.get(artifact)
+                destination = os.path.join(solution_path, artifact)
+                if (record
+                        and record.get('inputs') == artifact_fingerprint(artifact, requirements,
+                                                                         self.compact)
+                        and os.path.exists(destination)
+                        and os.path.getsize(destination) == record.get('bytes')):
+                    artifacts[artifact] = record
+                    continue
+                artifacts[artifact] = self._stage_artifact(solution_path, artifact, requirements)
+                rewritten.append(artifact)
+
+            if rewritten or manifest.get('requirements') != requirements:
+                self._stage_manifest(solution_path, solution_name, requirements, artifacts)
+            with TRACER.span('commit'):
+                self.writer.commit()
+        except BaseException:
+            self.writer.abort()
+            raise
+
+        if rewritten:
+            self._index_solution(solution_name, solution_path, requirements, artifacts, start)
+
+        return {
+            'name': solution_name,
+            'path': solution_path,
+            'type': 'expense_approval',
+            'rewritten': rewritten,
+            'unchanged': [a for a in ARTIFACT_INPUTS if a not in rewritten],
+        }
+
+    def _build_artifact(self, artifact: str, requirements: Dict) -> bytes:
+        """Build one artifact's file contents"""
+        content = self._artifact_content(artifact, requirements)
+        with TRACER.span('serialize', artifact=artifact):
+            if isinstance(content, str):
+                return content.encode('utf-8')
+            return b"".join(iter_json(content, self.compact))
+
+    def _artifact_content(self, artifact: str, requirements: Dict):
+        """Build one artifact as text or a JSON-serializable (possibly lazy) value"""
+        with TRACER.span('build', artifact=artifact):
+            if artifact == "app_definition.json":
+                content = self._generate_app_definition(requirements)
+            elif artifact == "governance.md":
+                content = self._generate_governance(requirements)
+            elif artifact == "security_roles.json":
+                content = self._generate_security_roles(requirements)
+            else:
+                raise KeyError(f"unknown artifact: {artifact}")
+        return content
+
+    def _stage_artifact(self, solution_path: str, artifact: str, requirements: Dict) -> Dict:
+        """
+        Stage one artifact with the writer, reusing cached bytes when available,
+        and return its manifest record (input fingerprint, output hash and size).
+        """
+        fingerprint, data, link_from = self._artifact_data(artifact, requirements)
+        with TRACER.span('write', artifact=artifact):
+            self.writer.stage(os.path.join(solution_path, artifact), data, link_from=link_from)
+        return self._artifact_record(fingerprint, data)
+
+    def _prepare_artifact(self, solution_path: str, artifact: str, requirements: Dict,
+                          staged: List) -> Dict:
+        """Like _stage_artifact, but adds the prepared file to staged (any thread)"""
+        fingerprint, data, link_from = self._artifact_data(artifact, requirements)
+        with TRACER.span('write', artifact=artifact):
+            staged.append(self.writer.prepare(os.path.join(solution_path, artifact), data, link_from))
+        return self._artifact_record(fingerprint, data)
+
+    def _artifact_data(self, artifact: str, requirements: Dict):
+        """
+        Return (fingerprint, data, cache path to link from or None) for one
+        artifact. Cached artifacts are bytes; everything else is a _DigestStream
+        serialized as the writer consumes it. Artifacts built from table specs
+        skip the cache: they are unique per request and can be very large.
+        """
+        fingerprint = artifact_fingerprint(artifact, requirements, self.compact)
+        link_from = None
+        if (self.cache is not None and artifact in CACHEABLE_ARTIFACTS
+                and not any(requirements.get(field) for field in ARTIFACT_INPUTS[artifact])):
+            data = self.cache.get(fingerprint)
+            if data is None:
+                data = self._build_artifact(artifact, requirements)
+                self.cache.put(fingerprint, data)
+            link_from = self.cache.entry_path(fingerprint)
+        else:
+            content = self._artifact_content(artifact, requirements)
+            if isinstance(content, str):
+                data = _DigestStream((content.encode('utf-8'),))
+            else:
+                data = _DigestStream(iter_json(content, self.compact))
+        return fingerprint, data, link_from
+
+    @staticmethod
+    def _artifact_record(fingerprint: str, data) -> Dict:
+        """Manifest record for staged data (bytes, or a fully consumed _DigestStream)"""
+        if isinstance(data, bytes):
+            return {'inputs': fingerprint, 'sha256': hashlib.sha256(data).hexdigest(),
+                    'bytes': len(data)}
+        return {'inputs': fingerprint, 'sha256': data.sha256.hexdigest(), 'bytes': data.size}
+
+    def _stage_manifest(self, solution_path: str, solution_name: str,
+                        requirements: Dict, artifacts: Dict):
+        data = self._manifest_chunks(solution_name, requirements, artifacts)
+        with TRACER.span('write', artifact=SOLUTION_MANIFEST):
+            self.writer.stage(os.path.join(solution_path, SOLUTION_MANIFEST), data)
+
+    def _manifest_chunks(self, solution_name: str, requirements: Dict,
+                         artifacts: Dict) -> Iterator[bytes]:
+        manifest = {
+            'solution': solution_name,
+            'type': 'expense_approval',
+            'generator_version': GENERATOR_VERSION,
+            'requirements': requirements,
+            'artifacts': artifacts,
+        }
+        if self.compact:
+            manifest['compact'] = True  # so regeneration keeps the format
+        return iter_json(manifest, self.compact)
+
+    @staticmethod
+    def _read_manifest(solution_path: str) -> Dict:
+        try:
+            with open(os.path.join(solution_path, SOLUTION_MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _create_solution_dir(self):
+        """
+        Create a new, uniquely named solution directory.
+
+        The timestamp keeps names sortable; the random suffix plus an exclusive
+        mkdir guarantees two generations (in any process) never share a directory.
+        When writing to a SolutionPack the name is reserved in the pack instead.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        while True:
+            solution_name = f"ExpenseApproval_{timestamp}_{uuid.uuid4().hex[:8]}"
+            if isinstance(self.writer, SolutionPack):
+                if self.writer.reserve(solution_name):
+                    return solution_name, self.writer.solution_path(solution_name)
+                continue
+            solution_path = os.path.join(self.output_dir, solution_name)
+            try:
+                os.makedirs(solution_path)
+            except FileExistsError:
+                continue
+            return solution_name, solution_path
+
+    def _generate_app_definition(self, requirements: Dict) -> Dict:
+        """
+        Generate Model-Driven App configuration.
+
+        Tables come from the requirements' 'tables' specs when given, otherwise
+        the expense request table. Enterprise version includes relationship
+        and form generation.
+        """
+        return {
+            "name": "Expense Approval System",
+            "uniqueName": "expense_approval",
+            "type": "ModelDriven",
+            "description": "Enterprise expense approval workflow with governance",
+            "tables": DataverseSchema.from_specs(requirements.get('tables') or DEFAULT_TABLES),
+            "flows": [
+                {
+                    "name": "Expense Approval Workflow",
+                    "type": "automated",
+                    "trigger": "Dataverse - When row is added or modified"
+                }
+            ],
+            "securityRoles": ["Expense Admin", "Expense Approver", "Expense Submitter"],
+            "note": "Enterprise version includes advanced routing, policy engines, and analytics"
+        }
+
+    def _generate_governance(self, requirements: Dict) -> str:
+        """
+        Generate comprehensive governance documentation.
+
+        Renders the precompiled GOVERNANCE_DOCUMENT template. Enterprise version
+        includes expanded compliance frameworks, industry-specific requirements,
+        and audit trail configuration.
+        """
+        return GOVERNANCE_DOCUMENT.render(requirements)
+
+    def _generate_security_roles(self, requirements: Optional[Dict] = None) -> 'PrivilegeMatrix':
+        """
+        Generate security role definitions.
+
+        With table specs in the requirements, each role is granted its expense
+        request privileges on every table in the model.
+        """
+        roles = PrivilegeMatrix.from_json(DEFAULT_SECURITY_ROLES)
+        specs = (requirements or {}).get('tables')
+        if not specs:
+            return roles
+        matrix = PrivilegeMatrix(roles.roles, [spec.get('logicalName') or spec['name'] for spec in specs],
+                                 roles.role_info, roles.extra)
+        matrix.fill_from(roles, roles.tables[0])
+        return matrix
+
+
+# Entry-point group third-party packages use to contribute solution patterns
+PATTERN_ENTRY_POINT_GROUP = 'power_platform_orchestrator.patterns'
+
+# Attribute a plugin file must define: the generator class (or factory)
+PLUGIN_ATTRIBUTE = 'Generator'
+
+
+class _PluginFile:
+    """Registry target for a plugin module that has not been imported yet"""
+
+    __slots__ = ('path',)
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+class PatternRegistry:
+    """
+    Registry of solution pattern generators, resolved lazily.
+
+    A pattern is registered by name with a target: a generator class or
+    factory, a "module:attribute" import path, an entry point, or a plugin
+    file. Discovery records names only; nothing is imported or instantiated
+    until the pattern is first requested, so startup cost stays flat as the
+    pattern library grows. A None target marks an enterprise-only pattern.
+
+    Supports the mapping protocol, so registry['expense_approval'] returns
+    the (shared) generator instance.
+    """
+
+    def __init__(self):
+        self._targets = OrderedDict()
+        self._descriptions = {}
+        self._keywords = {}
+        self._instances = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def register(self, name: str, target, description: str = "", keywords: str = ""):
+        with self._lock:
+            self._targets[name] = target
+            self._descriptions[name] = description
+            self._keywords[name] = keywords
+            self._instances.pop(name, None)
+            self.version += 1
+
+    def discover_entry_points(self, group: str = PATTERN_ENTRY_POINT_GROUP) -> int:
+        """Register every installed entry point in group; returns the count"""
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:  # Python 3.7
+            try:
+                from importlib_metadata import entry_points
+            except ImportError:
+                return 0
+
+        found = entry_points()
+        if hasattr(found, 'select'):
+            found = found.select(group=group)
+        else:
+            found = found.get(group, ())
+        count = 0
+        for entry_point in found:
+            if entry_point.name not in self._targets:
+                self.register(entry_point.name, entry_point)
+                count += 1
+        return count
+
+    def discover_plugins(self, directory: str) -> int:
+        """
+        Register each <pattern>.py in directory as pattern <pattern>; the module
+        must define PLUGIN_ATTRIBUTE. Returns the number of plugins found.
+        """
+        count = 0
+        for entry in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(entry)
+            if ext == '.py' and not name.startswith('_'):
+                self.register(name, _PluginFile(os.path.join(directory, entry)))
+                count += 1
+        return count
+
+    def names(self) -> List[str]:
+        return list(self._targets)
+
+    def available(self) -> List[str]:
+        """Patterns this installation can generate"""
+        return [name for name, target in self._targets.items() if target is not None]
+
+    def description(self, name: str) -> str:
+        return self._descriptions.get(name, "")
+
+    def descriptor(self, name: str) -> str:
+        """Text the router indexes for name: its description plus routing keywords"""
+        return f"{name.replace('_', ' ')} {self._descriptions.get(name, '')} {self._keywords.get(name, '')}"
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str):
+        """Return the generator for name, importing and creating it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._targets:
+                    raise KeyError(f"unknown pattern: {name!r}")
+                instance = self._resolve(name, self._targets[name])()
+                self._instances[name] = instance
+        return instance
+
+    def __getitem__(self, name: str):
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    @staticmethod
+    def _resolve(name: str, target) -> Callable:
+        if target is None:
+            raise LookupError(f"pattern {name!r} is an Enterprise version feature")
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(':')
+            return getattr(importlib.import_module(module_name), attribute or PLUGIN_ATTRIBUTE)
+        if isinstance(target, _PluginFile):
+            import importlib.util
+
+            spec = importlib.util.spec_from_file_location(f"orchestrator_plugin_{name}", target.path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = module
+            spec.loader.exec_module(module)
+            return getattr(module, PLUGIN_ATTRIBUTE)
+        if hasattr(target, 'load') and not callable(target):
+            return target.load()  # entry point
+        return target
+
+
+# Built-in patterns. Installed entry points and --plugin-dir add more.
+PATTERNS = PatternRegistry()
+PATTERNS.register('expense_approval', ExpenseApprovalGenerator,
+                  "Expense approval workflow with multi-level approvals and governance",
+                  "expense receipt reimbursement claim approve approver manager director "
+                  "travel spending limit budget cost center finance invoice purchase policy")
+PATTERNS.register('asset_tracking', None,
+                  "Asset tracking with mobile barcode scanning and location tracking",
+                  "asset equipment inventory device laptop hardware barcode qr scan "
+                  "location warehouse maintenance checkout lifecycle")
+PATTERNS.register('data_collection', None,
+                  "Data collection forms with business process flows and validation",
+                  "form intake survey collect submission data entry inspection "
+                  "application onboarding request questionnaire validation")
+PATTERNS.register('external_integration', None,
+                  "External system integration with Virtual Tables and custom connectors",
+                  "integration external system api connector sync synchronize sap erp crm "
+                  "salesforce import export legacy database virtual table")
+PATTERNS.register('analytics_dashboards', None,
+                  "Analytics dashboards with embedded Power BI reporting",
+                  "dashboard report reporting analytics power bi kpi metrics insight "
+                  "trend chart executive visualization")
+
+# Requirement fields that carry free text worth routing on
+ROUTING_FIELDS = ('business_problem', 'pain_point')
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _terms(text: str) -> List[str]:
+    """Lower-cased word unigrams (with plural 's' folded) plus adjacent bigrams"""
+    words = [word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+             for word in _TOKEN_PATTERN.findall(text.lower())]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+class PatternRouter:
+    """
+    Routes free-text requirements to the best matching solution pattern.
+
+    Builds a TF-IDF inverted index over every registered pattern's descriptor
+    once, then scores a requirement set by walking only the postings of its
+    own terms, so a lookup costs a few dictionary reads regardless of how many
+    patterns are installed. rank_many scores whole batches at once (with
+    NumPy). The index is rebuilt automatically if the registry changes (for
+    example after plugin discovery).
+
+    Enterprise version includes intent classification and adaptive questioning.
+    """
+
+    def __init__(self, registry: Optional[PatternRegistry] = None,
+                 fields: Tuple[str, ...] = ROUTING_FIELDS):
+        self.registry = registry or PATTERNS
+        self.fields = fields
+        self._names = []
+        self._postings = {}
+        self._idf = {}
+        self._arrays = None
+        self._indexed_version = None
+
+    # Distinct query texts rank_many scores per NumPy pass
+    BATCH_CHUNK = 4096
+
+    def build(self):
+        """(Re)build the index from the registry's current descriptors"""
+        names = self.registry.names()
+        documents = [_terms(self.registry.descriptor(name)) for name in names]
+        frequency = {}
+        for terms in documents:
+            for term in set(terms):
+                frequency[term] = frequency.get(term, 0) + 1
+
+        # Smoothed idf keeps terms shared by every pattern weakly positive
+        idf = {term: math.log((1 + len(names)) / (1 + count)) + 1.0
+               for term, count in frequency.items()}
+        postings = {}
+        for position, terms in enumerate(documents):
+            weights = {}
+            for term in terms:
+                weights[term] = weights.get(term, 0.0) + idf[term]
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                postings.setdefault(term, []).append((position, weight / norm))
+
+        self._names, self._postings, self._idf = names, postings, idf
+        self._arrays = None
+        self._indexed_version = self.registry.version
+
+    def _posting_arrays(self, np):
+        """The postings as CSR arrays (term ids, offsets, positions, weights), built on first use"""
+        if self._arrays is None:
+            postings = self._postings
+            term_ids = {term: number for number, term in enumerate(postings)}
+            offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+            np.cumsum([len(entries) for entries in postings.values()], out=offsets[1:])
+            positions = np.fromiter((position for entries in postings.values() for position, _ in entries),
+                                    dtype=np.int64, count=int(offsets[-1]))
+            weights = np.fromiter((weight for entries in postings.values() for _, weight in entries),
+                                  dtype=np.float64, count=int(offsets[-1]))
+            self._arrays = (term_ids, offsets, positions, weights)
+        return self._arrays
+
+    def _query_text(self, requirements) -> str:
+        if isinstance(requirements, str):
+            return requirements
+        return " ".join(str(requirements.get(field) or "") for field in self.fields)
+
+    def _query_weights(self, terms: List[str]) -> Dict[str, float]:
+        """Unit-length tf-idf weights of the indexed terms in a query"""
+        weights = {}
+        for term in terms:
+            if term in self._idf:
+                weights[term] = weights.get(term, 0.0) + self._idf[term]
+        norm = sum(weight * weight for weight in weights.values()) ** 0.5
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def _score_terms(self, terms: List[str]) -> Dict[int, float]:
+        scores = {}
+        for term, weight in self._query_weights(terms).items():
+            for position, pattern_weight in self._postings[term]:
+                scores[position] = scores.get(position, 0.0) + weight * pattern_weight
+        return scores
+
+    def _ranked(self, scores: Dict[int, float], available_only: bool) -> List[Tuple[str, float]]:
+        names = self._names
+        matches = sorted(scores.items(), key=lambda match: (-match[1], match[0]))
+        ranked = [(names[position], score) for position, score in matches]
+        if available_only:
+            available = self.registry.available()
+            ranked = [match for match in ranked if match[0] in available]
+        return ranked
+
+    def rank(self, requirements, available_only: bool = False) -> List[Tuple[str, float]]:
+        """
+        Score requirements (a requirements dict or plain text) against every
+        pattern; returns (pattern, cosine score) pairs for the patterns sharing
+        at least one term with the requirements, best match first.
+        """
+        if self._indexed_version != self.registry.version:
+            self.build()
+        return self._ranked(self._score_terms(_terms(self._query_text(requirements))),
+                            available_only)
+
+    def rank_many(self, batch, available_only: bool = False) -> List[List[Tuple[str, float]]]:
+        """
+        Score a batch of requirements against a single index snapshot; the
+        results match rank() for each item. Identical query texts, common in
+        bulk intake, are tokenized and scored once. With NumPy the distinct
+        texts are scored BATCH_CHUNK at a time: every (query, term) weight is
+        expanded through the postings and summed into a query x pattern score
+        matrix in one pass, and the matches are ranked with one sort per chunk.
+        """
+        if self._indexed_version != self.registry.version:
+            self.build()
+        rows = {}
+        order = [rows.setdefault(self._query_text(requirements), len(rows)) for requirements in batch]
+        texts = list(rows)
+
+        np = _numpy()
+        if np is None:
+            ranked = [self._ranked(self._score_terms(_terms(text)), available_only) for text in texts]
+        else:
+            ranked = []
+            for start in range(0, len(texts), self.BATCH_CHUNK):
+                ranked.extend(self._rank_chunk(np, texts[start:start + self.BATCH_CHUNK], available_only))
+        return [ranked[row] for row in order]
+
+    def _rank_chunk(self, np, texts: List[str], available_only: bool) -> List[List[Tuple[str, float]]]:
+        term_ids, offsets, positions, posting_weights = self._posting_arrays(np)
+        queries, terms, weights = [], [], []
+        for row, text in enumerate(texts):
+            for term, weight in self._query_weights(_terms(text)).items():
+                queries.append(row)
+                terms.append(term_ids[term])
+                weights.append(weight)
+
+        # One entry per (query term, posting), in the order rank() adds them up
+        terms = np.asarray(terms, dtype=np.int64)
+        starts = offsets[terms]
+        counts = offsets[terms + 1] - starts
+        owner = np.repeat(np.arange(len(terms)), counts)
+        slots = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + starts[owner]
+        patterns = len(self._names)
+        cells = np.asarray(queries, dtype=np.int64)[owner] * patterns + positions[slots]
+        shape = (len(texts), patterns)
+        scores = np.bincount(cells, np.asarray(weights, dtype=np.float64)[owner] * posting_weights[slots],
+                             minlength=shape[0] * patterns).reshape(shape)
+        matched = np.bincount(cells, minlength=shape[0] * patterns).reshape(shape) > 0
+        if available_only:
+            available = self.registry.available()
+            matched &= np.fromiter((name in available for name in self._names), dtype=bool, count=patterns)
+
+        # Each row sorted by best score, then pattern position; unmatched patterns sort last
+        keys = np.where(matched, -scores, np.inf)
+        order = np.argsort(keys, axis=1, kind='stable')
+        counts = matched.sum(axis=1)
+        kept = np.arange(patterns) < counts[:, None]
+        names = self._names
+        matches = list(zip([names[position] for position in order[kept].tolist()],
+                           (-np.take_along_axis(keys, order, axis=1)[kept]).tolist()))
+        bounds = np.cumsum(counts).tolist()
+        return [matches[begin:end] for begin, end in zip([0] + bounds[:-1], bounds)]
+
+    def route(self, requirements, default: str = 'expense_approval') -> str:
+        """Best available pattern for requirements, or default when nothing matches"""
+        ranked = self.rank(requirements, available_only=True)
+        return ranked[0][0] if ranked else default
+
+
+_transcript_lock = threading.Lock()
+
+
+def append_transcript(path: str, transcript: Dict):
+    """
+    Append one conversation to a transcript file: a JSON line holding its
+    start time and each (question, answer, seconds taken to answer).
+    """
+    line = json.dumps(transcript, ensure_ascii=False, separators=(',', ':')) + "\n"
+    with _transcript_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+
+def load_transcripts(path: str) -> Iterator[Dict]:
+    """Yield the conversations recorded in a transcript file"""
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{number}: invalid transcript: {exc}") from None
+
+
+class TranscriptInput:
+    """
+    Input source that answers the conversation's questions from a recorded
+    transcript instead of the keyboard. pace scales the recorded think time
+    between answers (0 answers immediately, 1 replays it in real time); once
+    the transcript runs out every question gets an empty answer.
+    """
+
+    def __init__(self, transcript: Dict, pace: float = 0.0):
+        self._answers = iter(transcript.get('answers', ()))
+        self.pace = pace
+        self.waited = 0.0
+
+    def __call__(self, prompt: str = "") -> str:
+        _, answer, seconds = next(self._answers, (None, "", 0.0))
+        if self.pace and seconds:
+            time.sleep(seconds * self.pace)
+            self.waited += seconds * self.pace
+        return answer
+
+
+class PowerPlatformOrchestrator:
+    """
+    Enterprise Power Platform Solutions Orchestrator
+
+    Demonstration version includes expense approval pattern.
+    Enterprise version includes 5+ solution patterns with advanced features.
+    """
+
+    # Pattern registry - Enterprise version includes full implementations
+    AVAILABLE_PATTERNS = PATTERNS
+
+    # Answers kept in conversation_history; older ones are dropped so
+    # long-lived orchestrators stay flat in memory
+    HISTORY_LIMIT = 100
+
+    def __init__(self, input_source: Callable[[str], str] = None,
+                 transcript_path: Optional[str] = None, generators: Optional[Dict] = None):
+        # input_source answers each question (input() by default, or e.g. a
+        # TranscriptInput); transcript_path records each conversation there.
+        # generators overrides the registry per pattern.
+        self.conversation_history = deque(maxlen=self.HISTORY_LIMIT)
+        self.router = PatternRouter(self.AVAILABLE_PATTERNS)
+        self.input_source = input_source or input
+        self.transcript_path = transcript_path
+        self.generators = generators or {}
+        self._transcript = None
+
+    def start_conversation(self):
+        """
+        Conversational requirements gathering using iterative questioning.
+
+        Based on design thinking methodologies for understanding business problems
+        before technical solutions. Enterprise version includes adaptive pattern
+        recognition and intelligent routing.
+        """
+        OUTPUT.detail("\n" + "="*70)
+        OUTPUT.detail("  Power Platform Solutions Orchestrator - Enterprise Edition")
+        OUTPUT.detail("="*70)
+        OUTPUT.detail("\nWelcome. I'll help design an enterprise Power Platform solution.")
+        OUTPUT.detail("\nThis demonstration focuses on expense approval workflows.")
+        OUTPUT.detail("Enterprise version includes asset tracking, data collection,")
+        OUTPUT.detail("external integration, and analytics dashboard patterns.\n")
+
+        # Conversational requirements gathering
+        self._transcript = {'started': round(time.time(), 3), 'answers': []}
+        with TRACER.span('requirements_intake'):
+            requirements = self._gather_requirements()
+        if self.transcript_path:
+            append_transcript(self.transcript_path, self._transcript)
+
+        # Generate solution
+        if requirements:
+            return self._generate_solution(requirements, self._select_pattern(requirements))
+
+        return None
+
+    def _select_pattern(self, requirements: Dict) -> str:
+        """Route the gathered requirements to the best matching available pattern"""
+        with TRACER.span('pattern_routing'):
+            ranked = self.router.rank(requirements)
+            pattern = self.router.route(requirements)
+
+        OUTPUT.event('pattern_routed', pattern=pattern,
+                     matches=[{'pattern': name, 'score': round(score, 4)} for name, score in ranked])
+        OUTPUT.detail("\nPattern match:")
+        for name, score in ranked[:3]:
+            note = "" if name in self.AVAILABLE_PATTERNS.available() else " (Enterprise version)"
+            OUTPUT.detail(f"  {name:<24}{score:.2f}{note}")
+        if not ranked:
+            OUTPUT.detail(f"  no keyword matches, using {pattern}")
+        if ranked and ranked[0][0] != pattern:
+            OUTPUT.detail(f"\nBest match {ranked[0][0]} is an Enterprise pattern; "
+                          f"generating {pattern} for this demo.")
+        return pattern
+
+    async def generate_many(self, requirements: Iterable[Dict], concurrency: int = 16,
+                            executor=None, generators: Optional[Dict] = None,
+                            on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Route and generate many requirement sets concurrently on one event loop.
+
+        Up to `concurrency` solutions are in flight at once; requirements are
+        pulled from the iterable only as capacity frees up. Generators with
+        generate_async overlap their artifact builds and writes, others run in
+        the executor. `generators` overrides the registry per pattern
+        (defaulting to the orchestrator's own; e.g. a generator with its own
+        output directory or cache). Each result gets 'index' (1-based) and
+        'seconds'; the list is returned in input order.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        generators = generators or self.generators
+        pending = enumerate(requirements, start=1)
+        results = {}
+
+        async def worker():
+            # Workers share one iterator; next() never awaits, so no locking is needed
+            for index, item in pending:
+                pattern = self.router.route(item)
+                generator = generators.get(pattern) or self.AVAILABLE_PATTERNS[pattern]
+                start = time.perf_counter()
+                if hasattr(generator, 'generate_async'):
+                    solution = await generator.generate_async(item, executor)
+                else:
+                    solution = await loop.run_in_executor(executor, generator.generate, item)
+                solution['index'] = index
+                solution['seconds'] = time.perf_counter() - start
+                results[index] = solution
+                if on_result is not None:
+                    on_result(solution)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        return [results[index] for index in sorted(results)]
+
+    def _ask(self, question: str, prompt: str = "Your answer: ") -> str:
+        """Read one answer from the input source, noting it and its think time in the transcript"""
+        start = time.perf_counter()
+        answer = self.input_source(prompt).strip()
+        if self._transcript is not None:
+            self._transcript['answers'].append([question, answer, round(time.perf_counter() - start, 3)])
+        return answer
+
+    def _gather_requirements(self) -> Dict:
+        """
+        Iterative questioning to understand business problem.
+
+        Enterprise version includes intelligent pattern detection,
+        adaptive questioning, and integration discovery.
+        """
+        requirements = {}
+
+        # Question 1: Business problem
+        OUTPUT.detail("Let's understand your business need.\n")
+        OUTPUT.detail("Question 1: What business problem are you solving?")
+        OUTPUT.detail("(For this demo, describe an expense approval challenge)\n")
+
+        problem = self._ask('problem')
+        if not problem:
+            OUTPUT.detail("\nDemo cancelled. Enterprise version includes guided prompts.")
+            return None
+
+        requirements['business_problem'] = problem
+        self.conversation_history.append(('problem', problem))
+
+        # Question 2: Current process pain points
+        OUTPUT.detail("\nQuestion 2: What's the most frustrating part of your current process?")
+        OUTPUT.detail("(e.g., delays in approvals, lack of visibility, manual tracking)\n")
+
+        pain_point = self._ask('pain_point')
+        if not pain_point:
+            pain_point = REQUIREMENT_DEFAULTS['pain_point']
+
+        requirements['pain_point'] = pain_point
+        self.conversation_history.append(('pain_point', pain_point))
+
+        # Question 3: Approval levels
+        OUTPUT.detail("\nQuestion 3: How many approval levels do you need?")
+        OUTPUT.detail("(e.g., 1 for manager only, 2 for manager + director, etc.)\n")
+
+        levels = self._ask('approval_levels')
+        if not levels:
+            levels = REQUIREMENT_DEFAULTS['approval_levels']
+
+        requirements['approval_levels'] = levels
+        self.conversation_history.append(('approval_levels', levels))
+
+        # Question 4: Key requirements
+        OUTPUT.detail("\nQuestion 4: Any specific compliance or policy requirements?")
+        OUTPUT.detail("(e.g., SOX compliance, spending limits, cost center tracking)\n")
+
+        compliance = self._ask('compliance', "Your answer (or press Enter to skip): ")
+        requirements['compliance'] = compliance if compliance else REQUIREMENT_DEFAULTS['compliance']
+
+        OUTPUT.event('requirements_gathered', requirements=requirements)
+        OUTPUT.detail("\n" + "="*70)
+        OUTPUT.detail("  Requirements Gathered")
+        OUTPUT.detail("="*70)
+        OUTPUT.detail(f"\nBusiness Problem: {requirements['business_problem']}")
+        OUTPUT.detail(f"Pain Point: {requirements['pain_point']}")
+        OUTPUT.detail(f"Approval Levels: {requirements['approval_levels']}")
+        OUTPUT.detail(f"Compliance: {requirements['compliance']}")
+
+        OUTPUT.detail("\nEnterprise version includes:")
+        OUTPUT.detail("  • Intelligent pattern detection across all business domains")
+        OUTPUT.detail("  • Adaptive questioning based on industry and context")
+        OUTPUT.detail("  • Integration discovery and feasibility analysis")
+        OUTPUT.detail("  • Stakeholder mapping and change impact assessment")
+
+        return requirements
+
+    def _generate_solution(self, requirements: Dict, pattern: str = 'expense_approval') -> Dict:
+        """
+        Generate enterprise-grade Power Platform solution.
+
+        Enterprise version includes multi-pattern generation, advanced
+        customization, and complete governance framework.
+        """
+        OUTPUT.detail("\n" + "="*70)
+        OUTPUT.detail("  Generating Enterprise Solution")
+        OUTPUT.detail("="*70)
+
+        with TRACER.span('pattern_lookup', pattern=pattern):
+            generator = self.generators.get(pattern) or self.AVAILABLE_PATTERNS[pattern]
+        solution = generator.generate(requirements)
+
+        OUTPUT.detail("\n" + "="*70)
+        OUTPUT.detail("  Solution Complete")
+        OUTPUT.detail("="*70)
+        OUTPUT.detail(f"\nGenerated: {solution['name']}")
+        OUTPUT.detail(f"Location: {solution['path']}")
+        OUTPUT.detail("\nFiles included:")
+        OUTPUT.detail("  ✓ app_definition.json - Model-Driven App configuration")
+        OUTPUT.detail("  ✓ governance.md - Comprehensive governance documentation")
+        OUTPUT.detail("  ✓ security_roles.json - Role-based access control definitions")
+
+        OUTPUT.detail("\nEnterprise version additionally includes:")
+        OUTPUT.detail("  • Dataverse table schemas with relationships")
+        OUTPUT.detail("  • Power Automate flow definitions")
+        OUTPUT.detail("  • Custom Page components (React)")
+        OUTPUT.detail("  • PCF controls for advanced UI")
+        OUTPUT.detail("  • PowerShell deployment automation")
+        OUTPUT.detail("  • Azure DevOps pipeline configuration")
+        OUTPUT.detail("  • Integration connectors and API documentation")
+        OUTPUT.detail("  • Executive dashboards and analytics")
+
+        OUTPUT.detail("\nNext steps:")
+        OUTPUT.detail("  1. Review governance.md for deployment requirements")
+        OUTPUT.detail("  2. Customize app_definition.json for your environment")
+        OUTPUT.detail("  3. Configure security_roles.json per your org structure")
+        OUTPUT.detail("  4. Contact for enterprise version with full ALM automation")
+
+        return solution
+
+
+def normalize_requirements(raw: Dict) -> Dict:
+    """
+    Normalize a requirements record to the shape _gather_requirements produces.
+
+    Values are stripped strings and blank answers fall back to the same
+    defaults as the conversation. Raises ValueError without a business problem.
+    An optional 'tables' schema spec must be a list and is validated and
+    kept as given; only load_requirements resolves paths, since service
+    payloads come from clients. Optional 'users' counts and 'locale' are
+    validated and normalized.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError(f"requirements must be an object, not {type(raw).__name__}")
+    requirements = {}
+    for field, default in REQUIREMENT_DEFAULTS.items():
+        value = raw.get(field)
+        value = str(value).strip() if value is not None else ""
+        if not value:
+            if default is None:
+                raise ValueError(f"missing required field '{field}'")
+            value = default
+        requirements[field] = value
+
+    users = raw.get('users')
+    if users:
+        if isinstance(users, str):
+            try:
+                users = json.loads(users)  # a JSON object in a CSV cell
+            except ValueError as e:
+                raise ValueError(f"'users' is not valid JSON: {e}") from None
+        if not isinstance(users, dict):
+            raise ValueError("'users' must map admin, approver and submitter to user counts")
+        counts = dict.fromkeys(COST_ROLES, 0)
+        for role, count in users.items():
+            name = str(role).strip().lower()
+            name = name[:-1] if name.endswith('s') else name
+            if name not in counts:
+                raise ValueError(f"unknown role in 'users': {role!r}; expected {', '.join(COST_ROLES)}")
+            try:
+                if isinstance(count, float) and not count.is_integer():
+                    raise ValueError
+                counts[name] = int(count)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"user count for {role!r} must be a whole number, not {count!r}") from None
+            if not 0 <= counts[name] <= MAX_USERS:
+                raise ValueError(f"user count for {role!r} must be between 0 and {MAX_USERS:,}")
+        requirements['users'] = counts
+
+    locale = raw.get('locale')
+    if locale:
+        wanted = str(locale).strip().replace('-', '_').lower()
+        matches = [name for name in CURRENCY_FORMATS if name.lower() == wanted]
+        if not matches:
+            raise ValueError(f"unsupported locale {locale!r}; expected one of {', '.join(CURRENCY_FORMATS)}")
+        requirements['locale'] = matches[0]
+
+    tables = raw.get('tables')
+    if tables:
+        if not isinstance(tables, list):
+            raise ValueError("'tables' must be a list of table specs")
+        DataverseSchema.from_specs(tables)  # reject bad specs at intake, not mid-generation
+        requirements['tables'] = tables
+    return requirements
+
+
+def load_requirements(path: str) -> Iterator[Dict]:
+    """
+    Stream normalized requirement records from a JSONL or CSV file.
+
+    The format is chosen by file extension (.csv, otherwise JSON lines).
+    Records are yielded one at a time so large batches are never held in memory.
+    A 'tables' string is a path to a JSON file of table specs, relative to
+    the requirements file's directory, and is loaded here.
+    """
+    is_csv = path.lower().endswith('.csv')
+    with open(path, newline='', encoding='utf-8') as f:
+        if is_csv:
+            records = enumerate(csv.DictReader(f), start=2)
+        else:
+            records = ((line_no, line) for line_no, line in enumerate(f, start=1) if line.strip())
+
+        for line_no, record in records:
+            try:
+                with TRACER.span('requirements_intake'):
+                    record = record if is_csv else json.loads(record)
+                    tables = record.get('tables') if isinstance(record, dict) else None
+                    if tables and isinstance(tables, str):
+                        try:
+                            with open(os.path.join(os.path.dirname(path), tables), encoding='utf-8') as spec:
+                                record['tables'] = json.load(spec)
+                        except OSError as e:
+                            raise ValueError(f"cannot read tables file {tables!r}: {e.strerror}") from None
+                    requirements = normalize_requirements(record)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: {e}") from None
+            yield requirements
+
+
+# Per-process generator used by pool workers, created once by _init_worker
+_worker_generator = None
+_worker_returns_spans = False
+
+
+def _init_worker(output_dir: str, cache_dir: Optional[str] = None, durability: str = 'batch',
+                 pack_path: Optional[str] = None, subprocess: bool = False, trace: bool = False,
+                 output_mode: str = 'silent', compact: bool = False, dedup: bool = False,
+                 index_path: Optional[str] = None, memory: bool = False, link_cache: bool = False):
+    global _worker_generator, _worker_returns_spans
+    if subprocess:
+        # Workers only contribute events; summaries come from the parent
+        OUTPUT.mode = 'events' if output_mode == 'events' else 'silent'
+
+    # Worker processes hand their spans back with each result
+    _worker_returns_spans = subprocess and trace
+    TRACER.enabled = trace
+    if memory and not TRACER.memory:
+        TRACER.track_memory()
+    if pack_path:
+        if subprocess:
+            # Packs are single-process, so each worker appends to its own
+            root, ext = os.path.splitext(pack_path)
+            pack_path = f"{root}-{os.getpid()}{ext}"
+        writer = (BlobStore if dedup else SolutionPack)(pack_path, durability)
+    else:
+        # generate_parallel syncs every file itself once the pool finishes,
+        # so deferring them here too would only hold their paths
+        writer = ArtifactWriter('none' if durability == 'batch' else durability)
+    index = None
+    if index_path:
+        index = SolutionIndex(index_path)
+        if subprocess:
+            # Pool workers exit without returning here; write buffered rows on the way out
+            from multiprocessing.util import Finalize
+            Finalize(index, index.close, exitpriority=10)
+    cache = ArtifactCache(disk_dir=cache_dir, link=link_cache)
+    _worker_generator = ExpenseApprovalGenerator(output_dir, cache, writer, compact, index)
+
+
+def _generate_worker(index: int, requirements: Dict) -> Dict:
+    """Generate one solution inside a pool worker and time it"""
+    start = time.perf_counter()
+    solution = _worker_generator.generate(requirements)
+    solution['index'] = index
+    solution['seconds'] = time.perf_counter() - start
+    solution['worker'] = os.getpid()
+    if _worker_returns_spans:
+        solution['spans'] = TRACER.drain()
+    return solution
+
+
+def _submit_bounded(executor, func: Callable, items: Iterable, max_in_flight: int,
+                    on_done: Callable[[Dict], None]):
+    """
+    Run func(index, item) on executor for each item (1-based index), pulling
+    items only while fewer than max_in_flight jobs are pending, and pass each
+    result to on_done in the calling thread as it completes.
+    """
+    import concurrent.futures
+
+    pending = set()
+
+    def drain(return_when):
+        nonlocal pending
+        done, pending = concurrent.futures.wait(pending, return_when=return_when)
+        for future in done:
+            on_done(future.result())
+
+    for index, item in enumerate(items, start=1):
+        if len(pending) >= max_in_flight:
+            drain(concurrent.futures.FIRST_COMPLETED)
+        pending.add(executor.submit(func, index, item))
+    drain(concurrent.futures.ALL_COMPLETED)
+
+
+def _percentiles(samples: Iterable[float]) -> Dict[str, float]:
+    """p50, p95, p99 and max of durations in seconds, in milliseconds (zeros without samples)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    last = len(ordered) - 1
+    summary = {f"p{q}_ms": ordered[min(last, int(q / 100 * len(ordered)))] * 1000 for q in (50, 95, 99)}
+    summary['max_ms'] = ordered[-1] * 1000
+    return summary
+
+
+def generate_parallel(requirements: Iterator[Dict], workers: Optional[int] = None,
+                      output_dir: str = "sample_output", use_threads: bool = False,
+                      cache_dir: Optional[str] = None, durability: str = 'batch',
+                      pack_path: Optional[str] = None, on_result=None,
+                      compact: bool = False, dedup: bool = False,
+                      index_path: Optional[str] = None, link_cache: bool = False) -> Dict:
+    """
+    Spread a batch of requirements across a pool of workers.
+
+    Requirements are consumed lazily with a bounded number of jobs in flight.
+    Every solution gets its own directory (see _create_solution_dir), and a
+    manifest listing all results in input order is written to output_dir.
+    Each worker keeps its own in-memory artifact cache; cache_dir adds a
+    shared on-disk tier. With 'batch' durability the fsyncs for every solution
+    are issued together once the pool has finished. With pack_path, solutions
+    go to SolutionPack files (one per worker process) instead of directories,
+    or deduplicating BlobStore files with dedup. With index_path every
+    worker adds its solutions to that SolutionIndex. compact writes every
+    JSON file, the batch manifest included, unindented. link_cache hard-links
+    disk cache entries into solutions instead of copying.
+    """
+    import concurrent.futures  # only batch runs pay for the executor machinery
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    batch_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    if use_threads:
+        # Threads share one generator; it keeps no per-call state
+        _init_worker(output_dir, cache_dir, durability, pack_path, trace=TRACER.enabled,
+                     compact=compact, dedup=dedup, index_path=index_path, link_cache=link_cache)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(output_dir, cache_dir, durability, pack_path, True, TRACER.enabled, OUTPUT.mode,
+                      compact, dedup, index_path, TRACER.memory, link_cache)
+        )
+
+    results = []
+
+    def collect(result):
+        TRACER.extend(result.pop('spans', ()), result['worker'])
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    start = time.perf_counter()
+    with executor:
+        _submit_bounded(executor, _generate_worker, requirements, max_in_flight, collect)
+
+    if use_threads and pack_path:
+        _worker_generator.writer.close()
+    if use_threads and index_path:
+        _worker_generator.index.close()
+
+    writer = ArtifactWriter(durability)
+    if durability == 'batch':
+        if pack_path:
+            packs = sorted({os.path.dirname(result['path']) for result in results})
+            writer.flush(packs + [pack + ".idx" for pack in packs])
+        else:
+            writer.flush([
+                os.path.join(result['path'], name)
+                for result in results
+                for name in list(ARTIFACT_INPUTS) + [SOLUTION_MANIFEST]
+            ])
+    total = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['index'])
+    manifest = {
+        'batch_id': batch_id,
+        'workers': workers,
+        'executor': 'thread' if use_threads else 'process',
+        'count': len(results),
+        'total_seconds': total,
+        'solutions': results,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, f"manifest_{batch_id}.json")
+    writer.stage(manifest_path, iter_json(manifest, compact))
+    writer.commit()
+    writer.flush()
+    manifest['manifest_path'] = manifest_path
+
+    return manifest
+
+
+def run_batch(path: str, generator: Optional['ExpenseApprovalGenerator'] = None,
+              workers: int = 1, cache_dir: Optional[str] = None,
+              durability: str = 'batch', pack_path: Optional[str] = None,
+              concurrency: int = 1, compact: bool = False, dedup: bool = False,
+              index_path: Optional[str] = None, link_cache: bool = False) -> Dict:
+    """
+    Generate one solution per requirements record without prompting.
+
+    With workers > 1 the batch runs on a process pool via generate_parallel
+    (each worker builds its own generator, so `generator` is only used in
+    process). With concurrency > 1 a single process overlaps that many
+    solutions' artifact I/O through PowerPlatformOrchestrator.generate_many.
+    Reports per-item timing as each solution completes and returns a
+    throughput summary for the whole run.
+    """
+    solutions = []
+    timings = []
+
+    def report(solution):
+        solutions.append(solution)
+        timings.append(solution['seconds'])
+        OUTPUT.event('batch_item', index=solution['index'], name=solution['name'],
+                     path=solution['path'], seconds=solution['seconds'])
+        OUTPUT.say(f"[{solution['index']}] {solution['name']}  {solution['seconds'] * 1000:.1f} ms")
+
+    batch_start = time.perf_counter()
+    if workers > 1:
+        manifest = generate_parallel(
+            load_requirements(path), workers=workers, cache_dir=cache_dir,
+            durability=durability, pack_path=pack_path, on_result=report, compact=compact,
+            dedup=dedup, index_path=index_path, link_cache=link_cache
+        )
+        solutions = manifest['solutions']
+    else:
+        if pack_path:
+            writer = (BlobStore if dedup else SolutionPack)(pack_path, durability)
+        else:
+            writer = ArtifactWriter(durability)
+        solution_index = SolutionIndex(index_path) if index_path else None
+        generator = generator or ExpenseApprovalGenerator(
+            cache=ArtifactCache(disk_dir=cache_dir, link=link_cache), writer=writer, compact=compact,
+            index=solution_index
+        )
+        if concurrency > 1:
+            import asyncio
+
+            orchestrator = PowerPlatformOrchestrator()
+            solutions = asyncio.run(orchestrator.generate_many(
+                load_requirements(path), concurrency,
+                generators={'expense_approval': generator}, on_result=report
+            ))
+        else:
+            for index, requirements in enumerate(load_requirements(path), start=1):
+                item_start = time.perf_counter()
+                solution = generator.generate(requirements)
+                solution['index'] = index
+                solution['seconds'] = time.perf_counter() - item_start
+                report(solution)
+        generator.writer.flush()
+        if pack_path:
+            generator.writer.close()
+        if solution_index is not None:
+            solution_index.close()
+    total = time.perf_counter() - batch_start
+
+    summary = {
+        'count': len(solutions),
+        'workers': workers,
+        'total_seconds': total,
+        'mean_ms': (sum(timings) / len(timings) * 1000) if timings else 0.0,
+        'max_ms': max(timings) * 1000 if timings else 0.0,
+        'solutions_per_second': len(solutions) / total if total > 0 else 0.0,
+        'solutions': solutions,
+    }
+
+    if workers > 1:
+        summary['manifest_path'] = manifest['manifest_path']
+    elif generator.cache is not None:
+        summary['cache'] = generator.cache.stats()
+    if pack_path and dedup:
+        # One store per worker process; report them together
+        totals = {}
+        for store_path in sorted({os.path.dirname(solution['path']) for solution in solutions}):
+            with BlobStore(store_path) as store:
+                for key, value in store.stats().items():
+                    totals[key] = totals.get(key, 0) + value
+        if totals:
+            totals['dedup_ratio'] = totals['logical_bytes'] / totals['stored_bytes']
+            summary['dedup'] = totals
+
+    OUTPUT.event('batch_complete', **{k: v for k, v in summary.items() if k != 'solutions'})
+    OUTPUT.say("\n" + "="*70)
+    OUTPUT.say("  Batch Complete")
+    OUTPUT.say("="*70)
+    OUTPUT.say(f"\nSolutions generated: {summary['count']} ({workers} worker(s))")
+    OUTPUT.say(f"Total time: {summary['total_seconds']:.2f} s")
+    OUTPUT.say(f"Mean per solution: {summary['mean_ms']:.1f} ms (max {summary['max_ms']:.1f} ms)")
+    OUTPUT.say(f"Throughput: {summary['solutions_per_second']:.1f} solutions/s")
+    if 'manifest_path' in summary:
+        OUTPUT.say(f"Manifest: {summary['manifest_path']}")
+    if 'cache' in summary:
+        cache = summary['cache']
+        OUTPUT.say(f"Artifact cache: {cache['hit_rate']:.0%} hit rate "
+                   f"({cache['memory_hits']} memory, {cache['disk_hits']} disk, {cache['misses']} misses, "
+                   f"{cache['memory_evictions'] + cache['disk_evictions']} evictions)")
+    if 'dedup' in summary:
+        dedup = summary['dedup']
+        OUTPUT.say(f"Deduplicated store: {dedup['logical_bytes'] / 1e6:.1f} MB of artifacts in "
+                   f"{dedup['disk_bytes'] / 1e6:.1f} MB on disk ({dedup['dedup_ratio']:.1f}x dedup, "
+                   f"{dedup['bytes_saved'] / 1e6:.1f} MB saved)")
+
+    return summary
+
+
+def run_regenerate(paths: List[str], generator: Optional['ExpenseApprovalGenerator'] = None,
+                   index_path: Optional[str] = None, compact: Optional[bool] = None) -> List[Dict]:
+    """
+    Regenerate stored solutions from the requirements in their manifests,
+    rewriting only artifacts whose inputs (or the generator version) changed.
+    Each solution keeps the JSON format its manifest records unless compact
+    is given, in which case every solution is rewritten in that format.
+    """
+    index = SolutionIndex(index_path) if index_path else None
+    generator = generator or ExpenseApprovalGenerator(cache=ArtifactCache(), index=index)
+    by_format = {generator.compact: generator}
+    results = []
+    for solution_path in paths:
+        manifest = generator._read_manifest(solution_path)
+        requirements = manifest.get('requirements')
+        if requirements is None:
+            OUTPUT.event('regenerate_skipped', path=solution_path)
+            OUTPUT.say(f"  - {solution_path}: no {SOLUTION_MANIFEST}, skipped")
+            continue
+        layout = manifest.get('compact', False) if compact is None else compact
+        if layout not in by_format:
+            by_format[layout] = ExpenseApprovalGenerator(generator.output_dir, generator.cache,
+                                                         generator.writer, layout, generator.index)
+        result = by_format[layout].regenerate(solution_path, requirements)
+        results.append(result)
+        OUTPUT.event('solution_regenerated', **result)
+        changed = ', '.join(result['rewritten']) or 'up to date'
+        OUTPUT.say(f"  ✓ {solution_path}: {changed}")
+
+    if index is not None:
+        index.close()
+    rewritten = sum(len(r['rewritten']) for r in results)
+    OUTPUT.say(f"\nRegenerated {len(results)} solution(s), {rewritten} artifact(s) rewritten")
+    return results
+
+
+def replay_transcripts(transcripts: Iterable[Dict], concurrency: int = 1, pace: float = 0.0,
+                       generators: Optional[Dict] = None,
+                       on_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Load generator: replay recorded conversations through the full
+    conversation path (questions, routing, generation), `concurrency` at a
+    time on a thread pool, and report end-to-end latency.
+
+    Each conversation gets its own orchestrator answering from a
+    TranscriptInput, so pace > 0 reproduces the recorded think time (scaled)
+    and with it the production traffic shape. Latency covers the whole
+    conversation; 'processing' excludes the replayed think time.
+    """
+    import concurrent.futures
+
+    def replay(index: int, transcript: Dict) -> Dict:
+        source = TranscriptInput(transcript, pace)
+        orchestrator = PowerPlatformOrchestrator(source, generators=generators)
+        start = time.perf_counter()
+        solution = orchestrator.start_conversation()
+        seconds = time.perf_counter() - start
+        return {'index': index, 'name': solution['name'] if solution else None,
+                'seconds': seconds, 'processing_seconds': seconds - source.waited}
+
+    results = []
+
+    def collect(result):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        _submit_bounded(executor, replay, transcripts, max(1, concurrency) * 4, collect)
+    total = time.perf_counter() - start
+
+    results.sort(key=lambda r: r['index'])
+    return {
+        'count': len(results),
+        'completed': sum(1 for r in results if r['name']),
+        'concurrency': concurrency,
+        'pace': pace,
+        'total_seconds': total,
+        'conversations_per_second': len(results) / total if total > 0 else 0.0,
+        'latency': _percentiles(r['seconds'] for r in results),
+        'processing': _percentiles(r['processing_seconds'] for r in results),
+        'results': results,
+    }
+
+
+def run_replay(path: str, concurrency: int = 1, pace: float = 0.0,
+               index_path: Optional[str] = None) -> Dict:
+    """Replay a transcript file and print per-conversation timing and a latency summary"""
+    def report(result):
+        OUTPUT.event('conversation_replayed', **result)
+        OUTPUT.say(f"[{result['index']}] {result['name'] or 'cancelled'}  {result['seconds'] * 1000:.1f} ms")
+
+    index = SolutionIndex(index_path) if index_path else None
+    generators = {'expense_approval': ExpenseApprovalGenerator(index=index)} if index else None
+    try:
+        summary = replay_transcripts(load_transcripts(path), concurrency, pace, generators, report)
+    finally:
+        if index is not None:
+            index.close()
+    latency, processing = summary['latency'], summary['processing']
+    OUTPUT.event('replay_complete', **{k: v for k, v in summary.items() if k != 'results'})
+    OUTPUT.say("\n" + "="*70)
+    OUTPUT.say("  Replay Complete")
+    OUTPUT.say("="*70)
+    OUTPUT.say(f"\nConversations: {summary['count']} ({summary['completed']} generated, "
+               f"{concurrency} concurrent, pace {pace:g})")
+    OUTPUT.say(f"Total time: {summary['total_seconds']:.2f} s "
+               f"({summary['conversations_per_second']:.1f} conversations/s)")
+    OUTPUT.say(f"End-to-end latency: p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+               f"p99 {latency['p99_ms']:.1f} ms")
+    if pace:
+        OUTPUT.say(f"Excluding think time: p50 {processing['p50_ms']:.1f} ms, "
+                   f"p95 {processing['p95_ms']:.1f} ms, p99 {processing['p99_ms']:.1f} ms")
+    return summary
+
+
+# Largest requirements payload the service accepts
+SERVICE_MAX_BODY = 1024 * 1024
+
+# Spans a traced service keeps (about ten per request); older ones are dropped
+SERVICE_TRACE_SPANS = 100000
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 422: 'Unprocessable Entity', 429: 'Too Many Requests',
+                500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class GenerationService:
+    """
+    Long-running local generation service.
+
+    Keeps generators, caches and the routing index warm across requests and
+    serves a minimal HTTP/1.1 API on localhost or a Unix socket:
+
+        POST /solutions   requirements JSON -> solution manifest
+        GET  /metrics     queue depth, throughput and latency percentiles
+        GET  /health
+
+    Requests are placed on a bounded asyncio queue drained by a fixed pool of
+    workers, each running generation in a thread. When the queue is full the
+    request is rejected immediately with 429 and Retry-After instead of
+    queueing unbounded work.
+
+    Enterprise version includes authentication, multi-tenant isolation and
+    horizontal scaling behind the portal gateway.
+    """
+
+    def __init__(self, output_dir: str = "sample_output", workers: int = 4, queue_size: int = 64,
+                 cache_dir: Optional[str] = None, durability: str = 'solution',
+                 latency_window: int = 4096, index_path: Optional[str] = None,
+                 link_cache: bool = False):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.router = PatternRouter(PATTERNS)
+        # Index rows are committed per solution so queries see them right away
+        self.index = SolutionIndex(index_path, batch_size=1) if index_path else None
+        self.generators = {
+            'expense_approval': ExpenseApprovalGenerator(
+                output_dir, ArtifactCache(disk_dir=cache_dir, link=link_cache), ArtifactWriter(durability),
+                index=self.index
+            ),
+        }
+        self._queue = None
+        self._executor = None
+        self._tasks = []
+        self._server = None
+        self._socket_path = None
+        self._started = time.time()
+        self._latencies = deque(maxlen=latency_window)
+        self._waits = deque(maxlen=latency_window)
+        self._in_flight = 0
+        self._counts = {'accepted': 0, 'completed': 0, 'rejected': 0, 'failed': 0}
+
+    def _generator(self, pattern: str):
+        generator = self.generators.get(pattern)
+        return generator if generator is not None else PATTERNS.get(pattern)
+
+    def _generate(self, pattern: str, requirements: Dict) -> Dict:
+        """Runs in a worker thread"""
+        solution = self._generator(pattern).generate(requirements)
+        path = solution.get('path')
+        manifest = ExpenseApprovalGenerator._read_manifest(path) if path and os.path.isdir(path) else {}
+        return {'solution': solution, 'pattern': pattern, 'manifest': manifest}
+
+    async def start(self, address: str):
+        """
+        Start listening. address is a port or host:port (TCP, localhost by
+        default) or a filesystem path for a Unix socket.
+        """
+        import asyncio
+        import concurrent.futures
+
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self.router.build()
+
+        if os.sep in address:
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = await asyncio.start_unix_server(self._handle, path=address)
+            self._socket_path = address
+        else:
+            host, _, port = address.rpartition(':')
+            self._server = await asyncio.start_server(self._handle, host or '127.0.0.1', int(port))
+        return self._server
+
+    async def stop(self):
+        """Stop accepting connections, finish queued work and release workers"""
+        import asyncio
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._socket_path and os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        if self._queue is not None:  # not started
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for generator in self.generators.values():
+            generator.writer.flush()
+        if self.index is not None:
+            self.index.close()
+
+    async def submit(self, requirements: Dict, pattern: Optional[str] = None) -> Dict:
+        """
+        Queue one generation and wait for its result. Raises asyncio.QueueFull
+        when the service is saturated and LookupError for unusable patterns.
+        """
+        import asyncio
+
+        pattern = pattern or self.router.route(requirements)
+        if pattern not in PATTERNS.available() and pattern not in self.generators:
+            raise LookupError(f"pattern {pattern!r} is not available")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((time.perf_counter(), pattern, requirements, future))
+        except asyncio.QueueFull:
+            self._counts['rejected'] += 1
+            raise
+        self._counts['accepted'] += 1
+        return await future
+
+    async def _worker(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            queued_at, pattern, requirements, future = await self._queue.get()
+            started = time.perf_counter()
+            self._waits.append(started - queued_at)
+            self._in_flight += 1
+            try:
+                result = await loop.run_in_executor(self._executor, self._generate, pattern, requirements)
+            except Exception as e:
+                self._counts['failed'] += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                finished = time.perf_counter()
+                self._latencies.append(finished - queued_at)
+                self._counts['completed'] += 1
+                result['queue_ms'] = (started - queued_at) * 1000
+                result['generate_ms'] = (finished - started) * 1000
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    def metrics(self) -> Dict:
+        uptime = time.time() - self._started
+        metrics = dict(self._counts)
+        metrics.update({
+            'uptime_seconds': uptime,
+            'workers': self.workers,
+            'in_flight': self._in_flight,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_capacity': self.queue_size,
+            'solutions_per_second': self._counts['completed'] / uptime if uptime > 0 else 0.0,
+            'latency': _percentiles(self._latencies),
+            'queue_wait': _percentiles(self._waits),
+        })
+        cache = self.generators['expense_approval'].cache
+        if cache is not None:
+            metrics['cache'] = cache.stats()
+        return metrics
+
+    async def _handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, honouring keep-alive"""
+        import asyncio
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version == 'HTTP/1.1')
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': "invalid Content-Length"}, False)
+                    break
+                if length > SERVICE_MAX_BODY:
+                    await self._respond(writer, 413, {'error': "payload too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, extra = await self._dispatch(method, target.split('?')[0], body)
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        import asyncio
+
+        if path == '/health':
+            return 200, {'status': 'ok'}, None
+        if path == '/metrics':
+            return 200, self.metrics(), None
+        if path != '/solutions':
+            return 404, {'error': f"no route for {path}"}, None
+        if method != 'POST':
+            return 405, {'error': "use POST"}, {'Allow': 'POST'}
+
+        try:
+            raw = json.loads(body.decode('utf-8') or 'null')
+            if not isinstance(raw, dict):
+                raise ValueError("body must be a JSON object of requirement fields")
+            requirements = normalize_requirements(raw)
+        except ValueError as e:
+            return 400, {'error': str(e)}, None
+
+        try:
+            result = await self.submit(requirements, raw.get('pattern'))
+        except asyncio.QueueFull:
+            return 429, {'error': "generation queue is full", 'queue_depth': self._queue.qsize()}, \
+                {'Retry-After': '1'}
+        except LookupError as e:
+            return 422, {'error': str(e)}, None
+        except Exception as e:
+            return 500, {'error': str(e)}, None
+        return 200, result, None
+
+    @staticmethod
+    async def _respond(writer, status: int, payload: Dict, keep_alive: bool,
+                       extra_headers: Optional[Dict] = None):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        headers.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+
+def run_service(address: str, workers: int = 4, queue_size: int = 64,
+                output_dir: str = "sample_output", cache_dir: Optional[str] = None,
+                durability: str = 'solution', index_path: Optional[str] = None,
+                link_cache: bool = False):
+    """Run GenerationService until interrupted"""
+    import asyncio
+
+    if TRACER.limit is None:
+        TRACER.keep_last(SERVICE_TRACE_SPANS)  # --trace must not grow without bound
+    service = GenerationService(output_dir, workers, queue_size, cache_dir, durability,
+                                index_path=index_path, link_cache=link_cache)
+
+    async def serve():
+        import signal
+
+        stopping = asyncio.Event()
+        try:
+            # Let process managers stop the service cleanly
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+        except (NotImplementedError, AttributeError):  # Windows
+            pass
+
+        await service.start(address)
+        OUTPUT.say(f"Serving on {address} ({service.workers} workers, queue {service.queue_size})")
+        OUTPUT.event('service_started', address=address, workers=service.workers,
+                     queue_size=service.queue_size)
+        try:
+            await stopping.wait()
+        finally:
+            await service.stop()
+            OUTPUT.event('service_stopped', **service._counts)
+
+    asyncio.run(serve())
+
+
+def _configure_console():
+    # Windows consoles default to a legacy code page; the CLI prints ✓ and box
+    # drawing characters, so switch stdout to UTF-8 (only when run as the CLI)
+    reconfigure = getattr(sys.stdout, 'reconfigure', None)
+    if reconfigure is not None and (sys.stdout.encoding or '').lower() != 'utf-8':
+        try:
+            reconfigure(encoding='utf-8')
+        except (ValueError, OSError):
+            pass
+
+
+def list_patterns(registry: Optional[PatternRegistry] = None):
+    """Print every registered pattern; enterprise-only patterns are marked"""
+    registry = registry or PATTERNS
+    for name in registry:
+        available = name in registry.available()
+        OUTPUT.say(f"  {name:<24}{'available' if available else 'Enterprise':<12}"
+                   f"{registry.description(name)}")
+        OUTPUT.event('pattern', name=name, available=available,
+                     description=registry.description(name))
+
+
+def main(argv: Optional[List[str]] = None):
     """Run the orchestrator demonstration"""
+    parser = argparse.ArgumentParser(description="Power Platform Solutions Orchestrator")
+    parser.add_argument(
+        '--batch', metavar='FILE',
+        help="generate one solution per record in a JSONL or CSV requirements file"
+    )
+    parser.add_argument(
+        '--workers', type=int, metavar='N',
+        help="worker processes for --batch (default: 1, serial) or threads for --serve (default: 4)"
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=1, metavar='N',
+        help="solutions --batch overlaps per process using async I/O, or conversations "
+             "--replay runs at once (default: 1)"
+    )
+    parser.add_argument(
+        '--compact', action='store_true',
+        help="write --batch JSON files without indentation (smaller, same content); "
+             "with --regenerate, convert solutions to it"
+    )
+    parser.add_argument(
+        '--cache-dir', metavar='DIR',
+        help="on-disk artifact cache shared across --batch runs and workers"
+    )
+    parser.add_argument(
+        '--link-cache', action='store_true',
+        help="hard-link --cache-dir entries into solutions instead of copying "
+             "(saves space; edit generated files only by replacing them)"
+    )
+    parser.add_argument(
+        '--durability', choices=DURABILITY_LEVELS,
+        help="when output is fsynced: never, once at the end (--batch default), "
+             "or per solution (--serve default)"
+    )
+    parser.add_argument(
+        '--pack', metavar='FILE',
+        help="write --batch solutions into a single pack file instead of directories"
+    )
+    parser.add_argument(
+        '--dedup', action='store_true',
+        help="with --pack, store each distinct chunk of content once across all solutions"
+    )
+    parser.add_argument(
+        '--unpack', nargs=2, metavar=('PACK', 'SOLUTION'),
+        help="extract one solution from a pack file into sample_output/"
+    )
+    parser.add_argument(
+        '--regenerate', nargs='+', metavar='DIR',
+        help="refresh existing solutions, rewriting only artifacts whose inputs changed"
+    )
+    parser.add_argument(
+        '--output', choices=('text', 'events', 'quiet'), default='text',
+        help="non-interactive output: readable text (default), JSON-lines events, or nothing"
+    )
+    parser.add_argument(
+        '--trace', metavar='FILE',
+        help="record pipeline spans; .json writes a Chrome trace, anything else JSON lines"
+    )
+    parser.add_argument(
+        '--profile', choices=('cprofile', 'tracemalloc', 'memory'),
+        help="profile this run and print the hottest functions or allocation sites, "
+             "or per-stage allocations with a growth check (memory)"
+    )
+    parser.add_argument(
+        '--profile-output', metavar='FILE',
+        help="save the raw pstats dump or tracemalloc snapshot from --profile"
+    )
+    parser.add_argument(
+        '--serve', metavar='ADDRESS',
+        help="run the generation service on PORT, HOST:PORT or a Unix socket path"
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=64, metavar='N',
+        help="requests --serve queues before answering 429 (default: 64)"
+    )
+    parser.add_argument(
+        '--index', metavar='FILE',
+        help="record generated solutions in a SQLite index (default for --query and "
+             f"--rebuild-index: {DEFAULT_INDEX})"
+    )
+    parser.add_argument(
+        '--query', nargs='+', metavar='FILTER',
+        help="list indexed solutions matching FIELD OP VALUE filters, e.g. "
+             "approval_levels>=3 compliance~SOX (~ means contains)"
+    )
+    parser.add_argument(
+        '--rebuild-index', nargs='+', metavar='PATH',
+        help="rebuild the index from solution directories, pack files, or directories holding either"
+    )
+    parser.add_argument(
+        '--record', metavar='FILE',
+        help="append the interactive conversation to a transcript file"
+    )
+    parser.add_argument(
+        '--replay', metavar='FILE',
+        help="replay recorded conversations non-interactively and report latency"
+    )
+    parser.add_argument(
+        '--pace', type=float, default=0.0, metavar='FACTOR',
+        help="--replay think time: 0 answers at once (default), 1 as recorded, 2 twice as slow"
+    )
+    parser.add_argument(
+        '--check-roles', metavar='PATH',
+        help="check security_roles.json (or a solution directory) for Organization-wide "
+             "delete outside admin roles; exits 1 on violations"
+    )
+    parser.add_argument(
+        '--diff-roles', nargs=2, metavar=('OLD', 'NEW'),
+        help="list privilege changes between two security_roles.json files or solutions"
+    )
+    parser.add_argument(
+        '--plugin-dir', action='append', default=[], metavar='DIR',
+        help="load extra solution patterns from <pattern>.py files in DIR (repeatable)"
+    )
+    parser.add_argument(
+        '--list-patterns', action='store_true',
+        help="list registered solution patterns without loading them, then exit"
+    )
+    args = parser.parse_args(argv)
+
+    PATTERNS.discover_entry_points()
+    for directory in args.plugin_dir:
+        PATTERNS.discover_plugins(directory)
+
+    if args.list_patterns:
+        action = list_patterns
+    elif args.query:
+        action = lambda: query_solutions(args.index or DEFAULT_INDEX, args.query)
+    elif args.rebuild_index:
+        action = lambda: rebuild_index(args.index or DEFAULT_INDEX, args.rebuild_index)
+    elif args.check_roles:
+        action = lambda: check_roles(args.check_roles)
+    elif args.diff_roles:
+        action = lambda: diff_roles(*args.diff_roles)
+    elif args.serve:
+        action = lambda: run_service(args.serve, workers=args.workers or 4,
+                                     queue_size=args.queue_size, cache_dir=args.cache_dir,
+                                     durability=args.durability or 'solution',
+                                     index_path=args.index, link_cache=args.link_cache)
+    elif args.regenerate:
+        action = lambda: run_regenerate(args.regenerate, index_path=args.index,
+                                        compact=args.compact or None)
+    elif args.unpack:
+        action = lambda: unpack_solution(*args.unpack)
+    elif args.replay:
+        action = lambda: run_replay(args.replay, concurrency=args.concurrency, pace=args.pace,
+                                    index_path=args.index)
+    elif args.batch:
+        action = lambda: run_batch(args.batch, workers=args.workers or 1, cache_dir=args.cache_dir,
+                                   durability=args.durability or 'batch', pack_path=args.pack,
+                                   concurrency=args.concurrency, compact=args.compact,
+                                   dedup=args.dedup, index_path=args.index,
+                                   link_cache=args.link_cache)
+    else:
+        action = None
+
+    _configure_console()
+    if action is None:
+        action = lambda: run_demo(args.record, args.index)
+        OUTPUT.mode = 'interactive'
+    else:
+        OUTPUT.mode = {'text': 'text', 'events': 'events', 'quiet': 'silent'}[args.output]
+    TRACER.enabled = bool(args.trace)
+    if args.profile:
+        result = profile_run(action, args.profile, args.profile_output)
+    else:
+        result = action()
+
+    if args.trace:
+        TRACER.export(args.trace)
+        OUTPUT.say(f"\nTrace written to {args.trace}")
+        for name, entry in sorted(TRACER.summary().items(), key=lambda item: -item[1]['total_ms']):
+            OUTPUT.say(f"  {name:<22}{entry['count']:>8} spans{entry['total_ms']:>12.2f} ms total"
+                       f"{entry['mean_ms']:>10.3f} ms mean")
+
+    if args.check_roles and result:
+        sys.exit(1)
+
+
+def unpack_solution(pack_path: str, solution_id: str, destination_dir: str = "sample_output") -> str:
+    """Extract one packed solution into a regular solution directory"""
+    with open_pack(pack_path) as pack:
+        solution_path = pack.extract(solution_id, destination_dir)
+    OUTPUT.event('solution_extracted', path=solution_path)
+    OUTPUT.say(f"✓ Extracted: {solution_path}")
+    return solution_path
+
+
+# Index --query and --rebuild-index use unless --index names another
+DEFAULT_INDEX = os.path.join("sample_output", "solutions.db")
+
+
+def query_solutions(index_path: str, filters: List[str], limit: int = 50) -> List[Dict]:
+    """Print the indexed solutions matching every filter (e.g. approval_levels>=3 compliance~SOX)"""
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"no solution index at {index_path}; "
+                                f"generate with --index or run --rebuild-index first")
+    with SolutionIndex(index_path) as index:
+        start = time.perf_counter()
+        total = index.count(filters)
+        rows = index.query(filters, limit=None if OUTPUT.mode == 'events' else limit)
+        seconds = time.perf_counter() - start
+
+    for row in rows:
+        OUTPUT.event('solution_found', **row)
+        OUTPUT.say(f"  {row['id']:<42}{str(row['approval_levels']):>3}  {(row['compliance'] or '')[:24]:<24}"
+                   f"{row['total_bytes'] or 0:>9,} B  {row['location']}")
+    if total > len(rows):
+        OUTPUT.say(f"  ... and {total - len(rows):,} more")
+    OUTPUT.say(f"{total:,} matching solution(s) ({seconds * 1000:.1f} ms)")
+    return rows
+
+
+def rebuild_index(index_path: str, paths: List[str]) -> int:
+    """Recreate the solution index from solution directories and pack files on disk"""
+    start = time.perf_counter()
+    with SolutionIndex(index_path) as index:
+        count = index.rebuild(paths)
+    seconds = time.perf_counter() - start
+    OUTPUT.event('index_rebuilt', index=index_path, solutions=count, seconds=seconds)
+    OUTPUT.say(f"Indexed {count:,} solution(s) into {index_path} in {seconds:.2f} s")
+    return count
+
+
+def load_roles(path: str) -> PrivilegeMatrix:
+    """Read security_roles.json, or the one in a solution directory"""
+    if os.path.isdir(path):
+        path = os.path.join(path, 'security_roles.json')
+    with open(path, encoding='utf-8') as f:
+        return PrivilegeMatrix.from_json(json.load(f))
+
+
+def check_roles(path: str, admin_roles: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Report Organization-wide delete held by any role other than the admin
+    roles (by default, roles with 'Admin' in their name).
+    """
+    matrix = load_roles(path)
+    if admin_roles is None:
+        admin_roles = [role for role in matrix.roles if 'Admin' in role]
+    violations = matrix.violations('delete', 'BusinessUnit', admin_roles)
+    OUTPUT.event('roles_checked', path=path, roles=len(matrix.roles), tables=len(matrix.tables),
+                 violations=len(violations))
+    for role, table in violations:
+        OUTPUT.say(f"  ✗ {role}: Organization-wide delete on {table}")
+    OUTPUT.say(f"{len(violations)} violation(s) across {len(matrix.roles)} role(s) "
+               f"and {len(matrix.tables)} table(s)")
+    return violations
+
+
+def diff_roles(old_path: str, new_path: str) -> Dict:
+    """Print what changed between two role sets"""
+    diff = load_roles(old_path).diff(load_roles(new_path))
+    OUTPUT.event('roles_diffed', **{key: len(value) for key, value in diff.items()})
+    for key in ('added_roles', 'removed_roles', 'added_tables', 'removed_tables'):
+        for name in diff[key]:
+            OUTPUT.say(f"  {'+' if key.startswith('added') else '-'} {key.split('_')[1][:-1]} {name}")
+    for role, table, privilege, before, after in diff['changes']:
+        OUTPUT.say(f"  ~ {role} / {table} / {privilege}: {before} -> {after}")
+    OUTPUT.say(f"{len(diff['changes'])} privilege change(s)")
+    return diff
+
+
+def run_demo(record_path: Optional[str] = None, index_path: Optional[str] = None):
+    """
+    Interactive demonstration: banner, conversation, generated solution.
+    record_path appends the conversation to a transcript file for --replay;
+    index_path adds the solution to a SolutionIndex.
+    """
     print("""
 ╔══════════════════════════════════════════════════════════════════════╗
 ║                                                                      ║
@@ -545,8 +4571,12 @@ Contact: mheck83@gmail.com for enterprise licensing
         print("\nDemo cancelled. Thank you for your interest.")
         return
 
-    orchestrator = PowerPlatformOrchestrator()
+    index = SolutionIndex(index_path) if index_path else None
+    generators = {'expense_approval': ExpenseApprovalGenerator(index=index)} if index else None
+    orchestrator = PowerPlatformOrchestrator(transcript_path=record_path, generators=generators)
     orchestrator.start_conversation()
+    if index is not None:
+        index.close()
 
     print("\n" + "="*70)
     print("\n Thank you for exploring the Power Platform Solutions Orchestrator.")